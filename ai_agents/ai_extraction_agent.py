@@ -7,15 +7,30 @@ Uses OpenAI GPT models to extract grant information from documents.
 import os
 import sys
 import json
+import mmap
+import shutil
+import hashlib
+import asyncio
+import random
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 import time
 
-# Add project paths
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Add project paths only when the sibling modules are not already importable
 project_root = Path(__file__).parent.parent
-sys.path.append(str(project_root / "scripts"))
-sys.path.append(str(project_root / "ai_agents"))
+try:
+    import data_models
+    import workflow_manager
+except ImportError:
+    for path in (str(project_root / "scripts"), str(project_root / "ai_agents")):
+        if path not in sys.path:
+            sys.path.append(path)
 
 from data_models import (
     GrantData, ExtractedField, ConfidenceLevel, TeamMember, 
@@ -25,22 +40,66 @@ from data_models import (
 from workflow_manager import WorkflowManager, WorkflowState
 
 
+def _json_loads(data):
+    """Parse JSON, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj) -> str:
+    """Serialize to a JSON string, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+
+_CONFIDENCE_MAP = {
+    "high": ConfidenceLevel.HIGH,
+    "medium": ConfidenceLevel.MEDIUM,
+    "low": ConfidenceLevel.LOW,
+    "uncertain": ConfidenceLevel.UNCERTAIN
+}
+
+
+def _create_field(value, confidence_str: str) -> Optional[ExtractedField]:
+    """Create an ExtractedField from a raw value and confidence string."""
+    if value is None:
+        return None
+    confidence = _CONFIDENCE_MAP.get(confidence_str.lower(), ConfidenceLevel.UNCERTAIN)
+    return ExtractedField(value, confidence)
+
+
 class DocumentProcessor:
     """Handles different document formats for text extraction."""
     
     @staticmethod
-    def extract_text_from_pdf(filepath: str) -> str:
-        """Extract text from PDF file."""
+    def extract_text_from_pdf(filepath: str) -> Tuple[str, int]:
+        """Extract text and page count from PDF file in a single pass.
+        
+        Uses PyMuPDF (fitz) when available, falling back to PyPDF2.
+        """
+        try:
+            import fitz
+        except ImportError:
+            fitz = None
+        
+        if fitz is not None:
+            try:
+                with fitz.open(filepath) as doc:
+                    text = "\n".join(page.get_text("text") for page in doc)
+                    return text, doc.page_count
+            except Exception as e:
+                raise Exception(f"Error extracting PDF text: {e}")
+        
         try:
             import PyPDF2
-            text = ""
             with open(filepath, 'rb') as file:
                 reader = PyPDF2.PdfReader(file)
-                for page in reader.pages:
-                    text += page.extract_text() + "\n"
-            return text
+                text = "\n".join(page.extract_text() or "" for page in reader.pages)
+                return text, len(reader.pages)
         except ImportError:
-            raise ImportError("PyPDF2 package required for PDF processing. Install with: pip install PyPDF2")
+            raise ImportError("PyMuPDF or PyPDF2 package required for PDF processing. Install with: pip install PyMuPDF")
         except Exception as e:
             raise Exception(f"Error extracting PDF text: {e}")
     
@@ -50,25 +109,33 @@ class DocumentProcessor:
         try:
             import docx
             doc = docx.Document(filepath)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text
+            return "\n".join(paragraph.text for paragraph in doc.paragraphs)
         except ImportError:
             raise ImportError("python-docx package required for Word processing. Install with: pip install python-docx")
         except Exception as e:
             raise Exception(f"Error extracting Word text: {e}")
     
+    # Text files larger than this are memory-mapped instead of read into a buffer
+    MMAP_THRESHOLD_BYTES = 10 * 1024 * 1024
+    
     @staticmethod
-    def extract_text_from_txt(filepath: str) -> str:
-        """Extract text from plain text file."""
+    def _decode_text(raw) -> str:
+        """Decode file bytes as UTF-8, falling back to latin-1."""
         try:
-            with open(filepath, 'r', encoding='utf-8') as file:
-                return file.read()
+            return str(raw, 'utf-8')
         except UnicodeDecodeError:
-            # Try with different encoding
-            with open(filepath, 'r', encoding='latin-1') as file:
-                return file.read()
+            return str(raw, 'latin-1')
+    
+    @classmethod
+    def extract_text_from_txt(cls, filepath: str) -> str:
+        """Extract text from plain text file with a single read."""
+        try:
+            with open(filepath, 'rb') as file:
+                size = os.fstat(file.fileno()).st_size
+                if size > cls.MMAP_THRESHOLD_BYTES:
+                    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        return cls._decode_text(mapped)
+                return cls._decode_text(file.read())
         except Exception as e:
             raise Exception(f"Error reading text file: {e}")
     
@@ -79,9 +146,10 @@ class DocumentProcessor:
         extension = file_path.suffix.lower()
         
         start_time = time.time()
+        total_pages = None
         
         if extension == '.pdf':
-            text = cls.extract_text_from_pdf(filepath)
+            text, total_pages = cls.extract_text_from_pdf(filepath)
         elif extension in ['.docx', '.doc']:
             text = cls.extract_text_from_docx(filepath)
         elif extension in ['.txt', '.md']:
@@ -100,68 +168,463 @@ class DocumentProcessor:
             'file_extension': extension
         }
         
-        # Estimate page count for PDFs
         if extension == '.pdf':
-            try:
-                import PyPDF2
-                with open(filepath, 'rb') as file:
-                    reader = PyPDF2.PdfReader(file)
-                    metadata['total_pages'] = len(reader.pages)
-            except:
-                metadata['total_pages'] = None
+            metadata['total_pages'] = total_pages
         
         return text, metadata
 
 
+class AsyncRateLimiter:
+    """Token-bucket limiter for OpenAI requests-per-minute and tokens-per-minute."""
+    
+    def __init__(self, max_requests_per_minute: float, max_tokens_per_minute: float):
+        """Initialize limiter with full request and token capacity."""
+        self.max_requests_per_minute = max_requests_per_minute
+        self.max_tokens_per_minute = max_tokens_per_minute
+        self.available_request_capacity = max_requests_per_minute
+        self.available_token_capacity = max_tokens_per_minute
+        self._last_update = time.monotonic()
+        # asyncio locks are bound to one event loop, and each batch runs in a
+        # new one, so the lock is recreated per loop while capacity carries over
+        self._lock = None
+        self._lock_loop = None
+    
+    def _refill(self):
+        """Restore capacity in proportion to the time elapsed since the last update."""
+        now = time.monotonic()
+        elapsed = now - self._last_update
+        self._last_update = now
+        self.available_request_capacity = min(
+            self.max_requests_per_minute,
+            self.available_request_capacity + elapsed * self.max_requests_per_minute / 60.0
+        )
+        self.available_token_capacity = min(
+            self.max_tokens_per_minute,
+            self.available_token_capacity + elapsed * self.max_tokens_per_minute / 60.0
+        )
+    
+    async def acquire(self, tokens: int):
+        """Wait until one request and the given number of tokens are available."""
+        # A single request larger than the bucket could never be admitted
+        tokens = min(tokens, self.max_tokens_per_minute)
+        
+        loop = asyncio.get_running_loop()
+        if self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        
+        async with self._lock:
+            while True:
+                self._refill()
+                if (self.available_request_capacity >= 1 and
+                        self.available_token_capacity >= tokens):
+                    self.available_request_capacity -= 1
+                    self.available_token_capacity -= tokens
+                    return
+                
+                # Sleep just long enough for the scarcer resource to refill
+                request_wait = (1 - self.available_request_capacity) * 60.0 / self.max_requests_per_minute
+                token_wait = (tokens - self.available_token_capacity) * 60.0 / self.max_tokens_per_minute
+                await asyncio.sleep(max(request_wait, token_wait, 0.01))
+
+
+class JSONObjectScanner:
+    """Tracks brace balance in streamed text to find the end of the top-level JSON object."""
+    
+    def __init__(self):
+        """Initialize scanner state."""
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escape = False
+    
+    def feed(self, chunk: str) -> int:
+        """Consume a chunk; return the index just past the closing brace, or -1."""
+        for i, char in enumerate(chunk):
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == '\\':
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char == '{':
+                self.depth += 1
+                self.started = True
+            elif char == '}' and self.started:
+                self.depth -= 1
+                if self.depth == 0:
+                    return i + 1
+        return -1
+
+
 class AIExtractionAgent:
     """AI agent for extracting grant information from documents."""
     
-    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4"):
-        """Initialize AI extraction agent."""
+    MAX_RESPONSE_TOKENS = 2000
+    MAX_API_ATTEMPTS = 3
+    
+    # Small documents are packed into one request up to this share of the context
+    BATCH_CONTEXT_FRACTION = 0.7
+    MAX_BATCH_RESPONSE_TOKENS = 4096
+    
+    # Context window sizes (tokens) used to budget document text per request
+    MODEL_CTX = {
+        "gpt-4": 8192,
+        "gpt-4-32k": 32768,
+        "gpt-4-turbo": 128000,
+        "gpt-4o": 128000,
+        "gpt-4o-mini": 128000,
+        "gpt-3.5-turbo": 16385,
+    }
+    DEFAULT_MODEL_CTX = 8192
+    
+    # Models that support response_format={"type": "json_object"}: whole
+    # families by prefix, plus exact names where older snapshots reject it
+    # (e.g. gpt-3.5-turbo-0613 and gpt-3.5-turbo-16k)
+    JSON_MODE_MODEL_PREFIXES = ("gpt-4o", "gpt-4-turbo", "gpt-4-1106", "gpt-4-0125")
+    JSON_MODE_MODELS = frozenset({"gpt-3.5-turbo", "gpt-3.5-turbo-1106", "gpt-3.5-turbo-0125"})
+    CONTEXT_SAFETY_TOKENS = 128
+    
+    # tiktoken encodings keyed by model name, shared across instances
+    _encodings: Dict[str, object] = {}
+    
+    _EXTRACTION_PROMPT = """You are an expert grant information extraction system. Your task is to extract structured information from grant-related documents including proposals, award letters, and application materials.
+
+Extract the following information in JSON format with confidence scores:
+
+1. Basic Grant Information:
+   - grant_id (grant identifier, award number, etc.)
+   - grant_name (title of the grant/project)
+   - funding_agency (organization providing funding)
+   - award_amount (monetary value, extract number only)
+   - grant_type (Research/Education/Infrastructure/Training/Equipment/Other)
+
+2. Timeline:
+   - application_date (when application was submitted)
+   - award_date (when grant was awarded)
+   - project_start_date (project start date)
+   - project_end_date (project end date)
+
+3. Team Information:
+   - principal_investigator (name and role)
+   - co_investigators (list of co-investigators if any)
+
+4. Project Information:
+   - abstract (project summary/description)
+   - objectives (list of project goals)
+
+5. Budget Summary:
+   - personnel (personnel costs)
+   - equipment (equipment costs)
+   - travel (travel costs)
+   - total (total award amount)
+
+For each extracted field, provide:
+- "value": the extracted information
+- "confidence": "high" (90-100%), "medium" (70-89%), "low" (50-69%), or "uncertain" (<50%)
+
+If information is not found or unclear, use "uncertain" confidence and provide your best interpretation.
+
+Return only valid JSON. Use null for missing values."""
+    
+    _BATCH_PROMPT_SUFFIX = """
+
+You will receive several numbered documents. Return a JSON object of the form {"docs": [...]} with one extraction object per document, in the same order as the documents."""
+    
+    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4o-mini",
+                 max_requests_per_minute: float = 500,
+                 max_tokens_per_minute: float = 30000,
+                 escalate_model: Optional[str] = "gpt-4o",
+                 escalation_uncertain_threshold: int = 3):
+        """Initialize AI extraction agent.
+        
+        Extractions that fail to parse or have more than
+        escalation_uncertain_threshold uncertain fields are retried with
+        escalate_model (set it to None to disable escalation).
+        """
         self.api_key = api_key or os.getenv('OPENAI_API_KEY')
         self.model = model
+        self.escalate_model = escalate_model
+        self.escalation_uncertain_threshold = escalation_uncertain_threshold
         self.workflow_manager = WorkflowManager()
+        self.rate_limiter = AsyncRateLimiter(max_requests_per_minute, max_tokens_per_minute)
+        
+        # OpenAI clients are created on first use and reused so HTTP
+        # connections are pooled across requests
+        self._client = None
+        self._aclient = None
+        
+        # Process pool for CPU-bound text extraction during batch runs
+        self._extract_pool = None
+        
+        # Workflow directories used during batch processing
+        base_path = Path(self.workflow_manager.base_path)
+        self._processing_dir = base_path / "intake" / "processing"
+        self._extracted_dir = base_path / "workflows" / "extracted"
+        self._processed_dir = base_path / "intake" / "processed"
+        
+        # Cached AI responses keyed by document content hash
+        self._cache_dir = self._extracted_dir / "_cache"
+        
+        # Token counts of the constant extraction prompt, keyed by model
+        self._prompt_tokens: Dict[str, int] = {}
+        self._count_prompt_tokens(self._EXTRACTION_PROMPT)
         
         if not self.api_key:
             print("Warning: No OpenAI API key found. Set OPENAI_API_KEY environment variable or pass api_key parameter.")
             print("You can also run in simulation mode for testing.")
     
-    def _call_openai(self, prompt: str, text: str) -> str:
-        """Call OpenAI API with the given prompt and text."""
+    @classmethod
+    def _get_encoding(cls, model: str):
+        """Return the tiktoken encoding for a model, or None if tiktoken is unavailable."""
+        if model not in cls._encodings:
+            try:
+                import tiktoken
+            except ImportError:
+                cls._encodings[model] = None
+            else:
+                try:
+                    cls._encodings[model] = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    cls._encodings[model] = tiktoken.get_encoding("cl100k_base")
+        return cls._encodings[model]
+    
+    def _count_prompt_tokens(self, prompt: str, model: Optional[str] = None) -> int:
+        """Count prompt tokens for a model, caching the extraction prompt."""
+        model = model or self.model
+        cacheable = prompt is self._EXTRACTION_PROMPT
+        if cacheable and model in self._prompt_tokens:
+            return self._prompt_tokens[model]
+        
+        encoding = self._get_encoding(model)
+        # Without tiktoken, assume roughly 4 characters per token
+        count = len(prompt) // 4 if encoding is None else len(encoding.encode(prompt))
+        if cacheable:
+            self._prompt_tokens[model] = count
+        return count
+    
+    def _truncate_text(self, prompt: str, text: str, model: Optional[str] = None) -> str:
+        """Truncate document text to fit the model context alongside prompt and response."""
+        model = model or self.model
+        context = self.MODEL_CTX.get(model, self.DEFAULT_MODEL_CTX)
+        budget = max(0, context - self.MAX_RESPONSE_TOKENS
+                     - self._count_prompt_tokens(prompt, model) - self.CONTEXT_SAFETY_TOKENS)
+        
+        encoding = self._get_encoding(model)
+        if encoding is None:
+            return text[:budget * 4]
+        
+        tokens = encoding.encode(text)
+        if len(tokens) <= budget:
+            return text
+        return encoding.decode(tokens[:budget])
+    
+    def _build_messages(self, prompt: str, text: str,
+                        model: Optional[str] = None) -> List[Dict[str, str]]:
+        """Construct chat messages for an extraction request."""
+        return [
+            {"role": "system", "content": prompt},
+            {"role": "user", "content": f"Document text to analyze:\n\n{self._truncate_text(prompt, text, model)}"}
+        ]
+    
+    def _get_client(self):
+        """Return the shared synchronous OpenAI client."""
+        if self._client is None:
+            import openai
+            self._client = openai.OpenAI(api_key=self.api_key)
+        return self._client
+    
+    def _get_async_client(self):
+        """Return the shared asynchronous OpenAI client."""
+        if self._aclient is None:
+            import openai
+            self._aclient = openai.AsyncOpenAI(api_key=self.api_key)
+        return self._aclient
+    
+    async def _close_async_client(self):
+        """Close the async client; its connections belong to the current event loop."""
+        if self._aclient is not None:
+            await self._aclient.close()
+            self._aclient = None
+    
+    def _response_format_kwargs(self, model: str) -> Dict:
+        """Request JSON mode for models that support it so responses always parse."""
+        if model in self.JSON_MODE_MODELS or model.startswith(self.JSON_MODE_MODEL_PREFIXES):
+            return {"response_format": {"type": "json_object"}}
+        return {}
+    
+    @staticmethod
+    def _stream_piece(chunk, scanner: JSONObjectScanner) -> Tuple[str, bool]:
+        """Return a streamed chunk's text and whether it completes the JSON object."""
+        if not chunk.choices:
+            return "", False
+        content = chunk.choices[0].delta.content
+        if not content:
+            return "", False
+        end = scanner.feed(content)
+        if end >= 0:
+            return content[:end], True
+        return content, False
+    
+    @classmethod
+    def _collect_stream(cls, stream) -> str:
+        """Accumulate a streamed completion, stopping once the JSON object closes."""
+        scanner = JSONObjectScanner()
+        parts = []
+        try:
+            for chunk in stream:
+                piece, done = cls._stream_piece(chunk, scanner)
+                parts.append(piece)
+                if done:
+                    break
+        finally:
+            stream.close()
+        return "".join(parts)
+    
+    @classmethod
+    async def _collect_stream_async(cls, stream) -> str:
+        """Accumulate an async streamed completion, stopping once the JSON object closes."""
+        scanner = JSONObjectScanner()
+        parts = []
+        try:
+            async for chunk in stream:
+                piece, done = cls._stream_piece(chunk, scanner)
+                parts.append(piece)
+                if done:
+                    break
+        finally:
+            await stream.close()
+        return "".join(parts)
+    
+    @staticmethod
+    def _retryable_errors(openai_module) -> Tuple[type, ...]:
+        """OpenAI exceptions that indicate a transient failure worth retrying."""
+        return (
+            openai_module.RateLimitError,
+            openai_module.APITimeoutError,
+            openai_module.APIConnectionError,
+            openai_module.InternalServerError,
+        )
+    
+    @staticmethod
+    def _retry_delay(attempt: int) -> float:
+        """Jittered exponential backoff delay in seconds for the given attempt."""
+        return min(60, 2 ** attempt + random.random())
+    
+    def _call_openai(self, prompt: str, text: str, model: Optional[str] = None) -> str:
+        """Call OpenAI API with the given prompt and text (default model unless given).
+        
+        Transient API errors are retried with exponential backoff; the last
+        error is re-raised so the document is marked as failed.
+        """
         if not self.api_key:
             return self._simulate_ai_response()
         
         try:
             import openai
-            
-            # Set up OpenAI client
-            client = openai.OpenAI(api_key=self.api_key)
-            
-            # Construct messages
-            messages = [
-                {"role": "system", "content": prompt},
-                {"role": "user", "content": f"Document text to analyze:\n\n{text[:8000]}"}  # Limit text length
-            ]
-            
-            # Make API call
-            response = client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=0.1,  # Low temperature for consistent extraction
-                max_tokens=2000
-            )
-            
-            return response.choices[0].message.content
-            
         except ImportError:
             raise ImportError("openai package required for AI processing. Install with: pip install openai")
-        except Exception as e:
-            print(f"OpenAI API error: {e}")
+        
+        client = self._get_client()
+        retryable = self._retryable_errors(openai)
+        model = model or self.model
+        
+        for attempt in range(self.MAX_API_ATTEMPTS):
+            try:
+                stream = client.chat.completions.create(
+                    model=model,
+                    messages=self._build_messages(prompt, text, model),
+                    temperature=0.1,  # Low temperature for consistent extraction
+                    max_tokens=self.MAX_RESPONSE_TOKENS,
+                    stream=True,
+                    **self._response_format_kwargs(model)
+                )
+                return self._collect_stream(stream)
+            except retryable as e:
+                if attempt + 1 == self.MAX_API_ATTEMPTS:
+                    raise
+                delay = self._retry_delay(attempt)
+                print(f"OpenAI API error: {e} (retrying in {delay:.1f}s)")
+                time.sleep(delay)
+    
+    async def _chat_completion_async(self, messages: List[Dict[str, str]], max_tokens: int,
+                                     model: Optional[str] = None) -> str:
+        """Run a rate-limited chat completion, retrying transient API errors.
+        
+        Transient API errors are retried with exponential backoff; the last
+        error is re-raised so the document is marked as failed.
+        """
+        try:
+            import openai
+        except ImportError:
+            raise ImportError("openai package required for AI processing. Install with: pip install openai")
+        
+        client = self._get_async_client()
+        retryable = self._retryable_errors(openai)
+        
+        # Rate-limit cost estimate (roughly 4 characters per token)
+        estimated_tokens = sum(len(m["content"]) for m in messages) // 4 + max_tokens
+        
+        model = model or self.model
+        
+        for attempt in range(self.MAX_API_ATTEMPTS):
+            await self.rate_limiter.acquire(estimated_tokens)
+            try:
+                stream = await client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=0.1,  # Low temperature for consistent extraction
+                    max_tokens=max_tokens,
+                    stream=True,
+                    **self._response_format_kwargs(model)
+                )
+                return await self._collect_stream_async(stream)
+            except retryable as e:
+                if attempt + 1 == self.MAX_API_ATTEMPTS:
+                    raise
+                delay = self._retry_delay(attempt)
+                print(f"OpenAI API error: {e} (retrying in {delay:.1f}s)")
+                await asyncio.sleep(delay)
+    
+    async def _call_openai_async(self, prompt: str, text: str, model: Optional[str] = None) -> str:
+        """Call OpenAI API asynchronously with the given prompt and text."""
+        if not self.api_key:
             return self._simulate_ai_response()
+        
+        return await self._chat_completion_async(
+            self._build_messages(prompt, text, model), self.MAX_RESPONSE_TOKENS, model
+        )
+    
+    async def _call_openai_batch_async(self, prompt: str, texts: List[str]) -> List[str]:
+        """Extract several small documents with one request.
+        
+        Returns one JSON response string per document, in input order.
+        Raises ValueError if the model does not return one result per document.
+        """
+        if not self.api_key:
+            return [self._simulate_ai_response() for _ in texts]
+        
+        documents = "\n\n".join(
+            f"Document {i}:\n{text}" for i, text in enumerate(texts, 1)
+        )
+        messages = [
+            {"role": "system", "content": prompt + self._BATCH_PROMPT_SUFFIX},
+            {"role": "user", "content": f"Documents to analyze:\n\n{documents}"}
+        ]
+        max_tokens = min(self.MAX_RESPONSE_TOKENS * len(texts), self.MAX_BATCH_RESPONSE_TOKENS)
+        response = await self._chat_completion_async(messages, max_tokens)
+        
+        docs = _json_loads(response).get("docs")
+        if not isinstance(docs, list) or len(docs) != len(texts):
+            raise ValueError(f"Expected {len(texts)} documents in batch response")
+        return [_json_dumps(doc) for doc in docs]
     
     def _simulate_ai_response(self) -> str:
         """Simulate AI response for testing without API key."""
-        return json.dumps({
+        return _json_dumps({
             "grant_id": {"value": "SIMULATED-2024-001", "confidence": "medium"},
             "grant_name": {"value": "Simulated Grant Extraction", "confidence": "high"},
             "funding_agency": {"value": "Simulation Foundation", "confidence": "high"},
@@ -184,149 +647,68 @@ class AIExtractionAgent:
         })
     
     def create_extraction_prompt(self) -> str:
-        """Create the prompt for grant information extraction."""
-        return """You are an expert grant information extraction system. Your task is to extract structured information from grant-related documents including proposals, award letters, and application materials.
-
-Extract the following information in JSON format with confidence scores:
-
-1. Basic Grant Information:
-   - grant_id (grant identifier, award number, etc.)
-   - grant_name (title of the grant/project)
-   - funding_agency (organization providing funding)
-   - award_amount (monetary value, extract number only)
-   - grant_type (Research/Education/Infrastructure/Training/Equipment/Other)
-
-2. Timeline:
-   - application_date (when application was submitted)
-   - award_date (when grant was awarded)
-   - project_start_date (project start date)
-   - project_end_date (project end date)
-
-3. Team Information:
-   - principal_investigator (name and role)
-   - co_investigators (list of co-investigators if any)
-
-4. Project Information:
-   - abstract (project summary/description)
-   - objectives (list of project goals)
-
-5. Budget Summary:
-   - personnel (personnel costs)
-   - equipment (equipment costs)
-   - travel (travel costs)
-   - total (total award amount)
-
-For each extracted field, provide:
-- "value": the extracted information
-- "confidence": "high" (90-100%), "medium" (70-89%), "low" (50-69%), or "uncertain" (<50%)
-
-If information is not found or unclear, use "uncertain" confidence and provide your best interpretation.
-
-Return only valid JSON. Use null for missing values."""
+        """Return the prompt for grant information extraction."""
+        return self._EXTRACTION_PROMPT
+    
+    # Top-level ExtractedField attributes of GrantData
+    _TOP_FIELDS = ("grant_id", "grant_name", "funding_agency", "award_amount", "grant_type")
+    
+    # Nested sections: response key -> (dataclass, ExtractedField attributes)
+    _NESTED_FIELDS = {
+        "timeline": (Timeline, ("project_start_date", "project_end_date",
+                                "application_date", "award_date")),
+        "project": (ProjectInfo, ("abstract",)),
+        "budget": (BudgetSummary, ("personnel", "equipment", "travel", "total")),
+    }
     
     def parse_ai_response(self, response: str) -> GrantData:
         """Parse AI response into GrantData structure."""
         try:
-            data = json.loads(response)
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError
+            data = _json_loads(response)
         except json.JSONDecodeError as e:
             print(f"Error parsing AI response as JSON: {e}")
             return self._create_empty_grant_data()
         
         grant_data = GrantData()
         
-        # Helper function to create ExtractedField
-        def create_field(value, confidence_str):
-            if value is None:
-                return None
-            confidence_map = {
-                "high": ConfidenceLevel.HIGH,
-                "medium": ConfidenceLevel.MEDIUM,
-                "low": ConfidenceLevel.LOW,
-                "uncertain": ConfidenceLevel.UNCERTAIN
-            }
-            confidence = confidence_map.get(confidence_str.lower(), ConfidenceLevel.UNCERTAIN)
-            return ExtractedField(value, confidence)
-        
         # Extract basic information
-        if "grant_id" in data:
-            grant_data.grant_id = create_field(
-                data["grant_id"].get("value"), 
-                data["grant_id"].get("confidence", "uncertain")
-            )
+        for name in self._TOP_FIELDS:
+            node = data.get(name)
+            if node:
+                setattr(grant_data, name, _create_field(
+                    node.get("value"), node.get("confidence", "uncertain")
+                ))
         
-        if "grant_name" in data:
-            grant_data.grant_name = create_field(
-                data["grant_name"].get("value"),
-                data["grant_name"].get("confidence", "uncertain")
-            )
-        
-        if "funding_agency" in data:
-            grant_data.funding_agency = create_field(
-                data["funding_agency"].get("value"),
-                data["funding_agency"].get("confidence", "uncertain")
-            )
-        
-        if "award_amount" in data:
-            grant_data.award_amount = create_field(
-                data["award_amount"].get("value"),
-                data["award_amount"].get("confidence", "uncertain")
-            )
-        
-        if "grant_type" in data:
-            grant_data.grant_type = create_field(
-                data["grant_type"].get("value"),
-                data["grant_type"].get("confidence", "uncertain")
-            )
-        
-        # Extract timeline
-        if "timeline" in data:
-            timeline_data = data["timeline"]
-            grant_data.timeline = Timeline()
+        # Extract timeline, project and budget sections
+        for section, (section_cls, field_names) in self._NESTED_FIELDS.items():
+            section_data = data.get(section)
+            if section_data is None:
+                continue
+            section_obj = section_cls()
+            setattr(grant_data, section, section_obj)
             
-            for field in ["project_start_date", "project_end_date", "application_date", "award_date"]:
-                if field in timeline_data:
-                    setattr(grant_data.timeline, field, create_field(
-                        timeline_data[field].get("value"),
-                        timeline_data[field].get("confidence", "uncertain")
+            for name in field_names:
+                node = section_data.get(name)
+                if node:
+                    setattr(section_obj, name, _create_field(
+                        node.get("value"), node.get("confidence", "uncertain")
                     ))
         
         # Extract principal investigator
-        if "principal_investigator" in data:
-            pi_data = data["principal_investigator"]
-            if "name" in pi_data:
-                grant_data.principal_investigator = TeamMember(
-                    name=create_field(
-                        pi_data["name"].get("value"),
-                        pi_data["name"].get("confidence", "uncertain")
-                    ),
-                    role=create_field(
-                        pi_data.get("role", {}).get("value", "Principal Investigator"),
-                        pi_data.get("role", {}).get("confidence", "high")
-                    )
+        pi_data = data.get("principal_investigator")
+        if pi_data and "name" in pi_data:
+            role_data = pi_data.get("role") or {}
+            grant_data.principal_investigator = TeamMember(
+                name=_create_field(
+                    pi_data["name"].get("value"),
+                    pi_data["name"].get("confidence", "uncertain")
+                ),
+                role=_create_field(
+                    role_data.get("value", "Principal Investigator"),
+                    role_data.get("confidence", "high")
                 )
-        
-        # Extract project information
-        if "project" in data:
-            project_data = data["project"]
-            grant_data.project = ProjectInfo()
-            
-            if "abstract" in project_data:
-                grant_data.project.abstract = create_field(
-                    project_data["abstract"].get("value"),
-                    project_data["abstract"].get("confidence", "uncertain")
-                )
-        
-        # Extract budget
-        if "budget" in data:
-            budget_data = data["budget"]
-            grant_data.budget = BudgetSummary()
-            
-            for field in ["personnel", "equipment", "travel", "total"]:
-                if field in budget_data:
-                    setattr(grant_data.budget, field, create_field(
-                        budget_data[field].get("value"),
-                        budget_data[field].get("confidence", "uncertain")
-                    ))
+            )
         
         return grant_data
     
@@ -334,11 +716,93 @@ Return only valid JSON. Use null for missing values."""
         """Create empty grant data structure for failed extractions."""
         return GrantData()
     
+    def _needs_escalation(self, grant_data: GrantData) -> bool:
+        """Whether an extraction is poor enough to retry with the escalation model."""
+        if not self.api_key or not self.escalate_model or self.escalate_model == self.model:
+            return False
+        extracted = list(grant_data.iter_fields())
+        uncertain = sum(1 for f in extracted if f.confidence == ConfidenceLevel.UNCERTAIN)
+        # An unparseable response yields no fields at all
+        return not extracted or uncertain > self.escalation_uncertain_threshold
+    
+    def _finalize_extraction(self, filepath: str, file_metadata: Dict, grant_data: GrantData,
+                             start_time: float, model_used: Optional[str] = None) -> GrantData:
+        """Attach extraction metadata and validation to parsed grant data."""
+        # Add extraction metadata
+        total_time = time.time() - start_time
+        grant_data.extraction_metadata = ExtractionMetadata(
+            source_document=Path(filepath).name,
+            extraction_timestamp=datetime.now(),
+            ai_model_used=model_used or self.model,
+            processing_time_seconds=total_time,
+            total_pages=file_metadata.get('total_pages'),
+            file_size_bytes=file_metadata.get('file_size_bytes')
+        )
+        
+        # Validate extracted data
+        validator = GrantDataValidator()
+        grant_data.validation_flags = validator.validate(grant_data)
+        
+        print(f"✓ Extraction of {Path(filepath).name} completed in {total_time:.1f}s")
+        return grant_data
+    
+    def _content_key(self, filepath: str) -> str:
+        """Hash the model name and document bytes into an extraction cache key."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(self.model.encode())
+        with open(filepath, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    def _load_cached_extraction(self, key: str) -> Optional[Dict]:
+        """Load a cached AI response and file metadata, or None on a cache miss."""
+        cache_path = self._cache_dir / f"{key}.json"
+        try:
+            with open(cache_path, 'rb') as f:
+                return _json_loads(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable extraction cache {cache_path.name}: {e}")
+            return None
+    
+    def _store_cached_extraction(self, key: str, file_metadata: Dict, ai_response: str,
+                                 grant_data: GrantData, model_used: str):
+        """Cache a real (non-simulated) AI response for the document content.
+        
+        Responses that yielded no fields are not cached, so the document is
+        sent to the API again next time instead of reusing a failed extraction.
+        """
+        if not self.api_key or not any(grant_data.iter_fields()):
+            return
+        try:
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(self._cache_dir / f"{key}.json", 'w') as f:
+                f.write(_json_dumps({
+                    'file_metadata': file_metadata,
+                    'ai_response': ai_response,
+                    'model': model_used
+                }))
+        except OSError as e:
+            print(f"Warning: Could not write extraction cache: {e}")
+    
     def process_document(self, filepath: str) -> Tuple[bool, GrantData, str]:
         """Process a single document and extract grant information."""
         start_time = time.time()
         
         try:
+            # Reuse a previous AI response for identical content
+            cache_key = self._content_key(filepath)
+            cached = self._load_cached_extraction(cache_key)
+            if cached is not None:
+                print(f"Using cached extraction for: {Path(filepath).name}")
+                grant_data = self._finalize_extraction(
+                    filepath, cached['file_metadata'],
+                    self.parse_ai_response(cached['ai_response']), start_time, cached.get('model')
+                )
+                return True, grant_data, "Extraction successful (cached)"
+            
             # Extract text from document
             print(f"Extracting text from: {Path(filepath).name}")
             text, file_metadata = DocumentProcessor.extract_text(filepath)
@@ -352,26 +816,21 @@ Return only valid JSON. Use null for missing values."""
             print("Calling AI for information extraction...")
             prompt = self.create_extraction_prompt()
             ai_response = self._call_openai(prompt, text)
-            
-            # Parse AI response
+            model_used = self.model
             grant_data = self.parse_ai_response(ai_response)
             
-            # Add extraction metadata
-            total_time = time.time() - start_time
-            grant_data.extraction_metadata = ExtractionMetadata(
-                source_document=Path(filepath).name,
-                extraction_timestamp=datetime.now(),
-                ai_model_used=self.model,
-                processing_time_seconds=total_time,
-                total_pages=file_metadata.get('total_pages'),
-                file_size_bytes=file_metadata.get('file_size_bytes')
-            )
+            if self._needs_escalation(grant_data):
+                print(f"Low-confidence extraction from {self.model}; retrying with {self.escalate_model}")
+                ai_response = self._call_openai(prompt, text, self.escalate_model)
+                model_used = self.escalate_model
+                grant_data = self.parse_ai_response(ai_response)
             
-            # Validate extracted data
-            validator = GrantDataValidator()
-            grant_data.validation_flags = validator.validate(grant_data)
+            self._store_cached_extraction(cache_key, file_metadata, ai_response, grant_data,
+                                          model_used)
             
-            print(f"✓ Extraction completed in {total_time:.1f}s")
+            grant_data = self._finalize_extraction(
+                filepath, file_metadata, grant_data, start_time, model_used
+            )
             return True, grant_data, "Extraction successful"
             
         except Exception as e:
@@ -379,8 +838,12 @@ Return only valid JSON. Use null for missing values."""
             print(f"✗ {error_msg}")
             return False, self._create_empty_grant_data(), error_msg
     
-    def process_pending_documents(self, limit: int = 5) -> List[Tuple[str, bool, str]]:
-        """Process multiple pending documents."""
+    def process_pending_documents(self, limit: int = 5, num_concurrent: int = 8,
+                                  batch_size: int = 4) -> List[Tuple[str, bool, str]]:
+        """Process multiple pending documents with up to num_concurrent AI calls in flight.
+        
+        Up to batch_size small documents are sent together in a single request.
+        """
         # Get pending documents from workflow manager
         pending_files = self.workflow_manager.get_next_documents_for_processing(
             WorkflowState.PROCESSING, limit
@@ -390,57 +853,224 @@ Return only valid JSON. Use null for missing values."""
             print("No documents in processing state")
             return []
         
-        results = []
+        # Create output directories once per batch rather than per document
+        for directory in (self._extracted_dir, self._processed_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+        
+        import concurrent.futures
         
-        for filename in pending_files:
-            print(f"\n=== Processing {filename} ===")
+        max_workers = min(os.cpu_count() or 1, len(pending_files))
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as pool:
+            self._extract_pool = pool
+            try:
+                return asyncio.run(
+                    self._process_pending_async(pending_files, num_concurrent, batch_size)
+                )
+            finally:
+                self._extract_pool = None
+    
+    async def _process_pending_async(self, pending_files: List[str], num_concurrent: int,
+                                     batch_size: int) -> List[Tuple[str, bool, str]]:
+        """Run pending document processing concurrently, bounded by a semaphore."""
+        semaphore = asyncio.Semaphore(max(1, num_concurrent))
+        
+        try:
+            # Extract text up front so small documents can share a request
+            prepared = await asyncio.gather(
+                *(self._prepare_pending_file_async(f) for f in pending_files)
+            )
             
-            # Get full path
-            processing_dir = Path(self.workflow_manager.base_path) / "intake" / "processing"
-            filepath = processing_dir / filename
+            needs_ai = [doc for doc in prepared if doc['error'] is None and doc['ai_response'] is None]
             
-            if not filepath.exists():
-                error_msg = f"File not found: {filepath}"
-                print(f"✗ {error_msg}")
-                self.workflow_manager.transition_state(filename, WorkflowState.ERROR, error_msg)
-                results.append((filename, False, error_msg))
-                continue
+            async def bounded(group: List[Dict]):
+                async with semaphore:
+                    await self._extract_group_async(group)
             
-            # Process document
-            success, grant_data, message = self.process_document(str(filepath))
+            await asyncio.gather(*(bounded(g) for g in self._pack_documents(needs_ai, batch_size)))
             
-            if success:
-                # Save extracted data
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                output_filename = f"{timestamp}_{filename.replace('.', '_')}.json"
-                output_path = Path(self.workflow_manager.base_path) / "workflows" / "extracted" / output_filename
-                
-                try:
-                    output_path.parent.mkdir(parents=True, exist_ok=True)
-                    save_grant_data(grant_data, str(output_path))
-                    
-                    # Move to extracted state
-                    self.workflow_manager.transition_state(filename, WorkflowState.EXTRACTED)
-                    
-                    # Move original document to processed
-                    processed_dir = Path(self.workflow_manager.base_path) / "intake" / "processed"
-                    processed_dir.mkdir(parents=True, exist_ok=True)
-                    filepath.rename(processed_dir / filename)
-                    
-                    print(f"✓ Saved extraction results: {output_filename}")
-                    results.append((filename, True, f"Extracted to {output_filename}"))
-                    
-                except Exception as e:
-                    error_msg = f"Failed to save results: {e}"
-                    print(f"✗ {error_msg}")
-                    self.workflow_manager.transition_state(filename, WorkflowState.ERROR, error_msg)
-                    results.append((filename, False, error_msg))
+            return list(await asyncio.gather(
+                *(self._record_pending_result_async(doc) for doc in prepared)
+            ))
+        finally:
+            await self._close_async_client()
+    
+    async def _prepare_pending_file_async(self, filename: str) -> Dict:
+        """Look up the cache for a pending document, or extract its text."""
+        print(f"\n=== Processing {filename} ===")
+        filepath = self._processing_dir / filename
+        doc = {
+            'filename': filename,
+            'filepath': filepath,
+            'start_time': time.time(),
+            'error': None,
+            'ai_response': None,
+            'grant_data': None,
+            'model_used': None,
+        }
+        
+        if not filepath.exists():
+            doc['error'] = f"File not found: {filepath}"
+            return doc
+        
+        loop = asyncio.get_running_loop()
+        try:
+            # Reuse a previous AI response for identical content
+            doc['cache_key'] = await loop.run_in_executor(None, self._content_key, str(filepath))
+            cached = self._load_cached_extraction(doc['cache_key'])
+            if cached is not None:
+                print(f"Using cached extraction for: {filename}")
+                doc['file_metadata'] = cached['file_metadata']
+                doc['ai_response'] = cached['ai_response']
+                doc['grant_data'] = self.parse_ai_response(cached['ai_response'])
+                doc['model_used'] = cached.get('model')
+                return doc
+            
+            # Text extraction is CPU-bound, so run it in the process pool
+            print(f"Extracting text from: {filename}")
+            text, doc['file_metadata'] = await loop.run_in_executor(
+                self._extract_pool, DocumentProcessor.extract_text, str(filepath)
+            )
+        except Exception as e:
+            doc['error'] = f"Document processing failed: {e}"
+            return doc
+        
+        if not text.strip():
+            doc['error'] = "No text extracted from document"
+            return doc
+        
+        print(f"Extracted {len(text)} characters of text from {filename}")
+        doc['text'] = text
+        return doc
+    
+    def _count_tokens(self, text: str) -> int:
+        """Count tokens for the current model, estimating without tiktoken."""
+        encoding = self._get_encoding(self.model)
+        if encoding is None:
+            return len(text) // 4
+        return len(encoding.encode(text))
+    
+    def _pack_documents(self, docs: List[Dict], batch_size: int) -> List[List[Dict]]:
+        """Greedily group small documents so each group fits one request."""
+        if batch_size <= 1:
+            return [[doc] for doc in docs]
+        
+        context = self.MODEL_CTX.get(self.model, self.DEFAULT_MODEL_CTX)
+        input_budget = int(context * self.BATCH_CONTEXT_FRACTION)
+        prompt_tokens = self._count_prompt_tokens(self._EXTRACTION_PROMPT)
+        
+        def fits(tokens: int, count: int) -> bool:
+            response_tokens = min(self.MAX_RESPONSE_TOKENS * count, self.MAX_BATCH_RESPONSE_TOKENS)
+            return (tokens <= input_budget and
+                    tokens + prompt_tokens + response_tokens + self.CONTEXT_SAFETY_TOKENS <= context)
+        
+        groups = []
+        current, current_tokens = [], 0
+        for doc in docs:
+            tokens = self._count_tokens(doc['text'])
+            if not fits(tokens, 2):
+                # Too large to share a request
+                groups.append([doc])
+                continue
+            if current and (len(current) >= batch_size or
+                            not fits(current_tokens + tokens, len(current) + 1)):
+                groups.append(current)
+                current, current_tokens = [], 0
+            current.append(doc)
+            current_tokens += tokens
+        if current:
+            groups.append(current)
+        return groups
+    
+    async def _extract_group_async(self, group: List[Dict]):
+        """Call the AI for a group of documents, falling back to single requests."""
+        prompt = self.create_extraction_prompt()
+        
+        if len(group) > 1:
+            try:
+                responses = await self._call_openai_batch_async(prompt, [doc['text'] for doc in group])
+            except Exception as e:
+                print(f"Batch extraction failed ({e}); retrying documents individually")
             else:
-                # Mark as error
-                self.workflow_manager.transition_state(filename, WorkflowState.ERROR, message)
-                results.append((filename, False, message))
+                for doc, response in zip(group, responses):
+                    doc['ai_response'] = response
+                await asyncio.gather(*(self._complete_document_async(doc, prompt) for doc in group))
+                return
+        
+        for doc in group:
+            try:
+                doc['ai_response'] = await self._call_openai_async(prompt, doc['text'])
+            except Exception as e:
+                doc['error'] = f"Document processing failed: {e}"
+                continue
+            await self._complete_document_async(doc, prompt)
+    
+    async def _complete_document_async(self, doc: Dict, prompt: str):
+        """Parse the AI response, escalating a poor one to the stronger model, then cache it."""
+        doc['model_used'] = self.model
+        doc['grant_data'] = self.parse_ai_response(doc['ai_response'])
+        
+        if self._needs_escalation(doc['grant_data']):
+            print(f"Low-confidence extraction of {doc['filename']} from {self.model}; "
+                  f"retrying with {self.escalate_model}")
+            try:
+                doc['ai_response'] = await self._call_openai_async(
+                    prompt, doc['text'], self.escalate_model
+                )
+            except Exception as e:
+                doc['error'] = f"Document processing failed: {e}"
+                return
+            doc['model_used'] = self.escalate_model
+            doc['grant_data'] = self.parse_ai_response(doc['ai_response'])
         
-        return results
+        self._store_cached_extraction(
+            doc['cache_key'], doc['file_metadata'], doc['ai_response'], doc['grant_data'],
+            doc['model_used']
+        )
+    
+    async def _record_pending_result_async(self, doc: Dict) -> Tuple[str, bool, str]:
+        """Save a processed document's results and record the outcome in the workflow."""
+        filename = doc['filename']
+        
+        if doc['error'] is None:
+            try:
+                grant_data = self._finalize_extraction(
+                    str(doc['filepath']), doc['file_metadata'], doc['grant_data'],
+                    doc['start_time'], doc['model_used']
+                )
+            except Exception as e:
+                doc['error'] = f"Document processing failed: {e}"
+        
+        if doc['error'] is not None:
+            # Mark as error
+            print(f"✗ {filename}: {doc['error']}")
+            self.workflow_manager.transition_state(filename, WorkflowState.ERROR, doc['error'])
+            return filename, False, doc['error']
+        
+        # Save extracted data
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_filename = f"{timestamp}_{filename.replace('.', '_')}.json"
+        output_path = self._extracted_dir / output_filename
+        
+        try:
+            save_grant_data(grant_data, str(output_path))
+            
+            # Move to extracted state
+            self.workflow_manager.transition_state(filename, WorkflowState.EXTRACTED)
+            
+            # Move original document to processed; shutil.move also handles
+            # intake directories on different filesystems
+            await asyncio.get_running_loop().run_in_executor(
+                None, shutil.move, str(doc['filepath']), str(self._processed_dir / filename)
+            )
+            
+            print(f"✓ Saved extraction results: {output_filename}")
+            return filename, True, f"Extracted to {output_filename}"
+            
+        except Exception as e:
+            error_msg = f"Failed to save results: {e}"
+            print(f"✗ {error_msg}")
+            self.workflow_manager.transition_state(filename, WorkflowState.ERROR, error_msg)
+            return filename, False, error_msg
 
 
 def main():
@@ -453,14 +1083,30 @@ def main():
                        help='Process all documents in processing state')
     parser.add_argument('--limit', type=int, default=5,
                        help='Maximum number of documents to process')
-    parser.add_argument('--model', default='gpt-4',
-                       help='OpenAI model to use (default: gpt-4)')
+    parser.add_argument('--num-concurrent', type=int, default=8,
+                       help='Maximum number of concurrent AI requests during batch processing')
+    parser.add_argument('--batch-size', type=int, default=4,
+                       help='Maximum number of small documents sent in one AI request (1 disables batching)')
+    parser.add_argument('--max-rpm', type=float, default=500,
+                       help='Maximum OpenAI requests per minute (default: 500)')
+    parser.add_argument('--max-tpm', type=float, default=30000,
+                       help='Maximum OpenAI tokens per minute (default: 30000)')
+    parser.add_argument('--model', default='gpt-4o-mini',
+                       help='OpenAI model to use (default: gpt-4o-mini)')
+    parser.add_argument('--escalate-model', default='gpt-4o',
+                       help='Model to retry low-confidence extractions with; empty string disables (default: gpt-4o)')
     parser.add_argument('--api-key', help='OpenAI API key (or set OPENAI_API_KEY env var)')
     
     args = parser.parse_args()
     
     # Initialize agent
-    agent = AIExtractionAgent(api_key=args.api_key, model=args.model)
+    agent = AIExtractionAgent(
+        api_key=args.api_key,
+        model=args.model,
+        max_requests_per_minute=args.max_rpm,
+        max_tokens_per_minute=args.max_tpm,
+        escalate_model=args.escalate_model or None
+    )
     
     if args.file:
         # Process specific file
@@ -477,7 +1123,11 @@ def main():
     
     elif args.process_all:
         # Process pending documents
-        results = agent.process_pending_documents(limit=args.limit)
+        results = agent.process_pending_documents(
+            limit=args.limit,
+            num_concurrent=args.num_concurrent,
+            batch_size=args.batch_size
+        )
         
         if not results:
             print("No documents to process")
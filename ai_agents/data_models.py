@@ -4,13 +4,20 @@ Data Models for CHI-Grants System
 Defines structured data formats and validation schemas for grant information.
 """
 
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Union
+from dataclasses import dataclass, field, fields, is_dataclass
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Union, get_args, get_origin, get_type_hints
 from datetime import datetime
 from enum import Enum
+from operator import attrgetter
 import json
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class GrantType(Enum):
     """Types of grants."""
@@ -39,7 +46,11 @@ class ConfidenceLevel(Enum):
     UNCERTAIN = "uncertain"  # <50% confidence
 
 
-@dataclass
+# Confidence levels that flag an extracted field for review
+LOW_CONFIDENCE_LEVELS = frozenset({ConfidenceLevel.LOW, ConfidenceLevel.UNCERTAIN})
+
+
+@dataclass(slots=True, frozen=True)
 class ExtractedField:
     """Represents a field extracted by AI with confidence scoring."""
     value: Union[str, float, int, List[str]]
@@ -48,7 +59,7 @@ class ExtractedField:
     alternatives: List[str] = field(default_factory=list)  # Alternative interpretations
 
 
-@dataclass
+@dataclass(slots=True)
 class BudgetSummary:
     """Budget breakdown for a grant."""
     personnel: Optional[ExtractedField] = None
@@ -60,7 +71,7 @@ class BudgetSummary:
     total: Optional[ExtractedField] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Timeline:
     """Grant timeline information."""
     application_date: Optional[ExtractedField] = None
@@ -70,7 +81,7 @@ class Timeline:
     duration_months: Optional[ExtractedField] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class TeamMember:
     """Team member information."""
     name: ExtractedField
@@ -79,7 +90,7 @@ class TeamMember:
     email: Optional[ExtractedField] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ProjectInfo:
     """Project-specific information."""
     title: Optional[ExtractedField] = None
@@ -89,7 +100,7 @@ class ProjectInfo:
     technical_approach: Optional[ExtractedField] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ExtractionMetadata:
     """Metadata about the extraction process."""
     source_document: str
@@ -101,7 +112,7 @@ class ExtractionMetadata:
     extraction_version: str = "1.0"
 
 
-@dataclass
+@dataclass(slots=True)
 class ValidationFlags:
     """Flags for data validation issues."""
     missing_required_fields: List[str] = field(default_factory=list)
@@ -111,7 +122,7 @@ class ValidationFlags:
     needs_human_review: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class GrantData:
     """Complete grant information structure."""
     
@@ -151,6 +162,25 @@ class GrantData:
     
     # Custom fields for additional data
     custom_fields: Dict[str, ExtractedField] = field(default_factory=dict)
+    
+    def iter_fields(self) -> Iterator[ExtractedField]:
+        """Yield every ExtractedField in the grant data, including nested sections."""
+        return _iter_extracted_fields(self)
+
+
+def _iter_extracted_fields(obj) -> Iterator[ExtractedField]:
+    """Recursively yield ExtractedField instances contained in obj."""
+    if isinstance(obj, ExtractedField):
+        yield obj
+    elif is_dataclass(obj):
+        for f in fields(obj):
+            yield from _iter_extracted_fields(getattr(obj, f.name))
+    elif isinstance(obj, list):
+        for item in obj:
+            yield from _iter_extracted_fields(item)
+    elif isinstance(obj, dict):
+        for item in obj.values():
+            yield from _iter_extracted_fields(item)
 
 
 class GrantDataEncoder(json.JSONEncoder):
@@ -160,7 +190,8 @@ class GrantDataEncoder(json.JSONEncoder):
         if isinstance(obj, (GrantData, Timeline, BudgetSummary, TeamMember, 
                           ProjectInfo, ExtractionMetadata, ValidationFlags, 
                           ExtractedField)):
-            return obj.__dict__
+            # Slotted dataclasses have no __dict__, so build the mapping from fields
+            return {f.name: getattr(obj, f.name) for f in fields(obj)}
         elif isinstance(obj, (GrantType, GrantStatus, ConfidenceLevel)):
             return obj.value
         elif isinstance(obj, datetime):
@@ -168,6 +199,34 @@ class GrantDataEncoder(json.JSONEncoder):
         return super().default(obj)
 
 
+_encode = GrantDataEncoder().default
+
+
+BUDGET_COMPONENTS = ('personnel', 'equipment', 'travel', 'supplies',
+                     'indirect_costs', 'other')
+BUDGET_TOLERANCE = 1000.0  # $1000 tolerance for rounding differences
+
+
+_get_budget_components = attrgetter(*BUDGET_COMPONENTS)
+
+
+def _sum_budget_components(budget: BudgetSummary) -> float:
+    """Sum the numeric budget components, skipping missing or invalid values."""
+    calculated_total = 0.0
+    for field_value in _get_budget_components(budget):
+        if field_value and field_value.value:
+            try:
+                calculated_total += float(field_value.value)
+            except (ValueError, TypeError):
+                pass
+    return calculated_total
+
+
+def _dates_in_order(start: str, end: str) -> bool:
+    """Return True if ISO date string start is strictly before end."""
+    return datetime.fromisoformat(start) < datetime.fromisoformat(end)
+
+
 class GrantDataValidator:
     """Validates grant data and provides feedback."""
     
@@ -175,6 +234,7 @@ class GrantDataValidator:
         'grant_id', 'grant_name', 'funding_agency', 
         'award_amount', 'principal_investigator'
     ]
+    _get_required_fields = attrgetter(*REQUIRED_FIELDS)
     
     @classmethod
     def validate(cls, grant_data: GrantData) -> ValidationFlags:
@@ -182,8 +242,11 @@ class GrantDataValidator:
         flags = ValidationFlags()
         
         # Check required fields
-        for field_name in cls.REQUIRED_FIELDS:
-            field_value = getattr(grant_data, field_name, None)
+        for field_name, field_value in zip(cls.REQUIRED_FIELDS,
+                                           cls._get_required_fields(grant_data)):
+            # TeamMember carries its value on the name field
+            if isinstance(field_value, TeamMember):
+                field_value = field_value.name
             if not field_value or not field_value.value:
                 flags.missing_required_fields.append(field_name)
         
@@ -192,9 +255,8 @@ class GrantDataValidator:
         if (timeline.project_start_date and timeline.project_end_date and
             timeline.project_start_date.value and timeline.project_end_date.value):
             try:
-                start_date = datetime.fromisoformat(timeline.project_start_date.value)
-                end_date = datetime.fromisoformat(timeline.project_end_date.value)
-                if start_date >= end_date:
+                if not _dates_in_order(timeline.project_start_date.value,
+                                       timeline.project_end_date.value):
                     flags.inconsistent_dates.append("Project start date is after end date")
             except ValueError:
                 flags.inconsistent_dates.append("Invalid date format")
@@ -204,19 +266,10 @@ class GrantDataValidator:
         if budget.total and budget.total.value:
             try:
                 total = float(budget.total.value)
-                calculated_total = 0
-                
-                for field_name in ['personnel', 'equipment', 'travel', 'supplies', 
-                                 'indirect_costs', 'other']:
-                    field_value = getattr(budget, field_name, None)
-                    if field_value and field_value.value:
-                        try:
-                            calculated_total += float(field_value.value)
-                        except (ValueError, TypeError):
-                            pass
+                calculated_total = _sum_budget_components(budget)
                 
                 # Allow for small rounding differences
-                if abs(total - calculated_total) > 1000:  # $1000 tolerance
+                if abs(total - calculated_total) > BUDGET_TOLERANCE:
                     flags.budget_calculation_errors.append(
                         f"Budget total ({total}) doesn't match sum of components ({calculated_total})"
                     )
@@ -236,9 +289,11 @@ class GrantDataValidator:
         
         # Check confidence levels
         low_confidence_fields = []
-        for field_name, field_value in grant_data.__dict__.items():
+        for grant_field in fields(grant_data):
+            field_name = grant_field.name
+            field_value = getattr(grant_data, field_name)
             if isinstance(field_value, ExtractedField):
-                if field_value.confidence in [ConfidenceLevel.LOW, ConfidenceLevel.UNCERTAIN]:
+                if field_value.confidence in LOW_CONFIDENCE_LEVELS:
                     low_confidence_fields.append(field_name)
         
         if low_confidence_fields:
@@ -259,25 +314,62 @@ class GrantDataValidator:
 
 def save_grant_data(grant_data: GrantData, filepath: str):
     """Save grant data to JSON file."""
+    if orjson is not None:
+        # orjson serializes dataclasses, enums and datetimes natively
+        Path(filepath).write_bytes(orjson.dumps(
+            grant_data, default=_encode,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_DATACLASS
+        ))
+        return
+    
     with open(filepath, 'w') as f:
         json.dump(grant_data, f, cls=GrantDataEncoder, indent=2)
 
 
+@lru_cache(maxsize=None)
+def _field_types(cls) -> Dict[str, type]:
+    """Resolved field annotations of a dataclass, computed once per class."""
+    return get_type_hints(cls)
+
+
+def _decode(tp, value):
+    """Rebuild a value of type tp from its JSON representation."""
+    if value is None:
+        return None
+    
+    origin = get_origin(tp)
+    if origin is Union:
+        args = [arg for arg in get_args(tp) if arg is not type(None)]
+        if len(args) == 1:
+            return _decode(args[0], value)
+        # Mixed unions such as ExtractedField.value are stored as plain JSON
+        return value
+    if origin is list:
+        item_type, = get_args(tp)
+        return [_decode(item_type, item) for item in value]
+    if origin is dict:
+        _, item_type = get_args(tp)
+        return {key: _decode(item_type, item) for key, item in value.items()}
+    if is_dataclass(tp):
+        return tp(**{
+            name: _decode(field_type, value[name])
+            for name, field_type in _field_types(tp).items()
+            if name in value
+        })
+    if isinstance(tp, type) and issubclass(tp, Enum):
+        return tp(value)
+    if tp is datetime:
+        return datetime.fromisoformat(value)
+    return value
+
+
 def load_grant_data(filepath: str) -> GrantData:
     """Load grant data from JSON file."""
-    with open(filepath, 'r') as f:
-        data = json.load(f)
-    
-    # Convert back to GrantData object (simplified reconstruction)
-    # In a full implementation, you'd want more sophisticated deserialization
-    grant_data = GrantData()
-    
-    # Basic reconstruction - this would need to be more comprehensive
-    for key, value in data.items():
-        if hasattr(grant_data, key):
-            setattr(grant_data, key, value)
+    raw = Path(filepath).read_bytes()
+    data = orjson.loads(raw) if orjson is not None else json.loads(raw)
     
-    return grant_data
+    # Rebuild nested dataclasses, enums and datetimes from the field annotations
+    return _decode(GrantData, data)
 
 
 def create_sample_grant_data() -> GrantData:
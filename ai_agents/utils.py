@@ -5,18 +5,22 @@ Common helpers for file processing, configuration, and error handling.
 """
 
 import os
+import re
+import stat
 import json
+import time
 import logging
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 from datetime import datetime
+from functools import lru_cache
 
 
 class Config:
     """Configuration management for AI agents."""
     
     DEFAULT_CONFIG = {
-        "openai_model": "gpt-4",
+        "openai_model": "gpt-4o-mini",
         "max_file_size_mb": 50,
         "max_text_length": 10000,
         "confidence_threshold": 0.7,
@@ -24,6 +28,13 @@ class Config:
         "retry_attempts": 3
     }
     
+    # Environment variable -> (config key, type converter)
+    ENV_OVERRIDES = {
+        'CHI_GRANTS_OPENAI_MODEL': ('openai_model', str),
+        'CHI_GRANTS_MAX_FILE_SIZE_MB': ('max_file_size_mb', int),
+        'CHI_GRANTS_CONFIDENCE_THRESHOLD': ('confidence_threshold', float)
+    }
+    
     def __init__(self, config_file: Optional[str] = None):
         """Initialize configuration."""
         self.config = self.DEFAULT_CONFIG.copy()
@@ -45,28 +56,13 @@ class Config:
     
     def _load_env_overrides(self):
         """Load configuration overrides from environment variables."""
-        env_mappings = {
-            'CHI_GRANTS_OPENAI_MODEL': 'openai_model',
-            'CHI_GRANTS_MAX_FILE_SIZE_MB': 'max_file_size_mb',
-            'CHI_GRANTS_CONFIDENCE_THRESHOLD': 'confidence_threshold'
-        }
-        
-        for env_var, config_key in env_mappings.items():
-            value = os.getenv(env_var)
+        for env_var, (config_key, convert) in self.ENV_OVERRIDES.items():
+            value = os.environ.get(env_var)
             if value:
-                # Try to convert to appropriate type
-                if config_key in ['max_file_size_mb', 'max_text_length', 'processing_timeout_seconds', 'retry_attempts']:
-                    try:
-                        self.config[config_key] = int(value)
-                    except ValueError:
-                        pass
-                elif config_key in ['confidence_threshold']:
-                    try:
-                        self.config[config_key] = float(value)
-                    except ValueError:
-                        pass
-                else:
-                    self.config[config_key] = value
+                try:
+                    self.config[config_key] = convert(value)
+                except ValueError:
+                    pass
     
     def get(self, key: str, default: Any = None) -> Any:
         """Get configuration value."""
@@ -78,6 +74,12 @@ class Config:
             json.dump(self.config, f, indent=2)
 
 
+# Shared by every Logger handler
+_LOG_FORMATTER = logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+
 class Logger:
     """Logging utility for AI agents."""
     
@@ -85,22 +87,27 @@ class Logger:
         """Initialize logger."""
         self.logger = logging.getLogger(name)
         self.logger.setLevel(logging.INFO)
+        # Handlers are attached here, so don't emit again through the root logger
+        self.logger.propagate = False
         
-        # Create formatter
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
+        # logging.getLogger returns the same logger per name, so only attach
+        # handlers that are not already present
+        handlers = self.logger.handlers
         
         # Console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setFormatter(formatter)
-        self.logger.addHandler(console_handler)
+        if not any(type(h) is logging.StreamHandler for h in handlers):
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(_LOG_FORMATTER)
+            self.logger.addHandler(console_handler)
         
         # File handler if specified
         if log_file:
-            file_handler = logging.FileHandler(log_file)
-            file_handler.setFormatter(formatter)
-            self.logger.addHandler(file_handler)
+            log_path = os.path.abspath(log_file)
+            if not any(isinstance(h, logging.FileHandler) and h.baseFilename == log_path
+                       for h in handlers):
+                file_handler = logging.FileHandler(log_file)
+                file_handler.setFormatter(_LOG_FORMATTER)
+                self.logger.addHandler(file_handler)
     
     def info(self, message: str):
         """Log info message."""
@@ -122,12 +129,12 @@ class Logger:
 class FileValidator:
     """File validation utilities."""
     
-    SUPPORTED_EXTENSIONS = {'.pdf', '.docx', '.doc', '.txt', '.md'}
+    SUPPORTED_EXTENSIONS = frozenset({'.pdf', '.docx', '.doc', '.txt', '.md'})
     
     @classmethod
     def is_supported_format(cls, filepath: str) -> bool:
         """Check if file format is supported."""
-        return Path(filepath).suffix.lower() in cls.SUPPORTED_EXTENSIONS
+        return os.path.splitext(filepath)[1].lower() in cls.SUPPORTED_EXTENSIONS
     
     @classmethod
     def validate_file_size(cls, filepath: str, max_size_mb: int = 50) -> bool:
@@ -140,27 +147,36 @@ class FileValidator:
     def is_readable(cls, filepath: str) -> bool:
         """Check if file is readable."""
         try:
-            with open(filepath, 'rb') as f:
-                f.read(1024)  # Try to read first 1KB
+            fd = os.open(filepath, os.O_RDONLY)
+        except OSError:
+            return False
+        try:
+            os.read(fd, 1)  # Try to read the first byte
             return True
-        except Exception:
+        except OSError:
             return False
+        finally:
+            os.close(fd)
     
     @classmethod
     def validate_file(cls, filepath: str, max_size_mb: int = 50) -> tuple[bool, str]:
         """Comprehensive file validation."""
-        file_path = Path(filepath)
-        
-        if not file_path.exists():
+        # One stat call covers existence, file type and size
+        try:
+            file_stat = os.stat(filepath)
+        except OSError:
             return False, f"File does not exist: {filepath}"
         
+        if not stat.S_ISREG(file_stat.st_mode):
+            return False, f"Not a regular file: {filepath}"
+        
         if not cls.is_supported_format(filepath):
             return False, f"Unsupported file format. Supported: {', '.join(cls.SUPPORTED_EXTENSIONS)}"
         
-        if not cls.validate_file_size(filepath, max_size_mb):
+        if file_stat.st_size > max_size_mb * 1024 * 1024:
             return False, f"File too large (max: {max_size_mb}MB)"
         
-        if not cls.is_readable(filepath):
+        if not os.access(filepath, os.R_OK):
             return False, "File is not readable"
         
         return True, "File validation passed"
@@ -169,8 +185,24 @@ class FileValidator:
 class TextProcessor:
     """Text processing utilities."""
     
-    @staticmethod
-    def clean_text(text: str) -> str:
+    # Control characters except tab and newline, for str.translate deletion
+    _CONTROL_CHARS = dict.fromkeys(i for i in range(32) if i not in (9, 10))
+    
+    # Pattern for numbers (including currency and decimals)
+    _NUMBER_RE = re.compile(r'\$?[\d,]+\.?\d*')
+    _NUMBER_STRIP = str.maketrans('', '', '$,')
+    
+    # Alternation of all date formats so the text is scanned once
+    _DATE_RE = re.compile('|'.join(f'(?:{pattern})' for pattern in (
+        r'\d{4}-\d{2}-\d{2}',  # YYYY-MM-DD
+        r'\d{1,2}/\d{1,2}/\d{4}',  # MM/DD/YYYY or M/D/YYYY
+        r'\d{1,2}-\d{1,2}-\d{4}',  # MM-DD-YYYY or M-D-YYYY
+        r'[A-Za-z]+ \d{1,2}, \d{4}',  # Month DD, YYYY
+        r'\d{1,2} [A-Za-z]+ \d{4}',  # DD Month YYYY
+    )))
+    
+    @classmethod
+    def clean_text(cls, text: str) -> str:
         """Clean extracted text for better AI processing."""
         if not text:
             return ""
@@ -179,7 +211,7 @@ class TextProcessor:
         text = ' '.join(text.split())
         
         # Remove control characters
-        text = ''.join(char for char in text if ord(char) >= 32 or char in '\n\t')
+        text = text.translate(cls._CONTROL_CHARS)
         
         # Normalize line endings
         text = text.replace('\r\n', '\n').replace('\r', '\n')
@@ -201,45 +233,30 @@ class TextProcessor:
         
         return truncated + "..."
     
-    @staticmethod
-    def extract_numbers(text: str) -> List[float]:
+    @classmethod
+    def extract_numbers(cls, text: str) -> List[float]:
         """Extract numeric values from text."""
-        import re
-        
-        # Pattern for numbers (including currency and decimals)
-        pattern = r'\$?[\d,]+\.?\d*'
-        matches = re.findall(pattern, text)
-        
         numbers = []
-        for match in matches:
+        strip = cls._NUMBER_STRIP
+        for match in cls._NUMBER_RE.findall(text):
             try:
                 # Clean and convert to float
-                clean_number = match.replace('$', '').replace(',', '')
-                numbers.append(float(clean_number))
+                numbers.append(float(match.translate(strip)))
             except ValueError:
                 continue
         
         return numbers
     
-    @staticmethod
-    def extract_dates(text: str) -> List[str]:
+    @classmethod
+    def extract_dates(cls, text: str) -> List[str]:
         """Extract potential dates from text."""
-        import re
-        
-        date_patterns = [
-            r'\d{4}-\d{2}-\d{2}',  # YYYY-MM-DD
-            r'\d{1,2}/\d{1,2}/\d{4}',  # MM/DD/YYYY or M/D/YYYY
-            r'\d{1,2}-\d{1,2}-\d{4}',  # MM-DD-YYYY or M-D-YYYY
-            r'[A-Za-z]+ \d{1,2}, \d{4}',  # Month DD, YYYY
-            r'\d{1,2} [A-Za-z]+ \d{4}',  # DD Month YYYY
-        ]
-        
-        dates = []
-        for pattern in date_patterns:
-            matches = re.findall(pattern, text)
-            dates.extend(matches)
-        
-        return dates
+        return cls._DATE_RE.findall(text)
+
+
+@lru_cache(maxsize=1)
+def _get_error_logger() -> logging.Logger:
+    """Return the shared ErrorHandler logger, configuring it on first use."""
+    return Logger("ErrorHandler").logger
 
 
 class ErrorHandler:
@@ -252,21 +269,19 @@ class ErrorHandler:
             return func(*args, **kwargs)
         except Exception as e:
             if log_errors:
-                Logger("ErrorHandler").error(f"Error executing {func.__name__}: {e}")
+                _get_error_logger().error("Error executing %s: %s", func.__name__, e)
             return default
     
     @staticmethod
     def retry_on_failure(func, max_attempts=3, delay=1.0):
         """Retry function execution on failure."""
-        import time
-        
         for attempt in range(max_attempts):
             try:
                 return func()
-            except Exception as e:
+            except Exception:
                 if attempt == max_attempts - 1:
-                    raise e
-                time.sleep(delay * (attempt + 1))  # Exponential backoff
+                    raise
+                time.sleep(delay * (1 << attempt))  # Exponential backoff
     
     @staticmethod
     def create_error_report(error: Exception, context: Dict = None) -> Dict:
@@ -289,18 +304,17 @@ class PerformanceMonitor:
     
     def start(self):
         """Start timing."""
-        self.start_time = datetime.now()
+        self.start_time = time.perf_counter_ns()
     
     def checkpoint(self, name: str):
         """Record checkpoint."""
         if self.start_time:
-            elapsed = (datetime.now() - self.start_time).total_seconds()
-            self.checkpoints[name] = elapsed
+            self.checkpoints[name] = (time.perf_counter_ns() - self.start_time) * 1e-9
     
     def get_elapsed(self) -> float:
         """Get total elapsed time."""
         if self.start_time:
-            return (datetime.now() - self.start_time).total_seconds()
+            return (time.perf_counter_ns() - self.start_time) * 1e-9
         return 0.0
     
     def get_report(self) -> Dict:
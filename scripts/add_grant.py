@@ -6,43 +6,73 @@ This script helps automate the creation of grant information files in the CHI-Gr
 
 import os
 import sys
+import csv
 from datetime import datetime
 import argparse
 import re
+from functools import lru_cache
+
+
+_SPECIAL_CHARS_RE = re.compile(r'[^\w\s-]')
+_SEPARATORS_RE = re.compile(r'[-\s]+')
 
 
 def sanitize_filename(name):
     """Convert grant name to a valid filename."""
     # Remove special characters and replace spaces with underscores
-    name = re.sub(r'[^\w\s-]', '', name)
-    name = re.sub(r'[-\s]+', '_', name)
+    name = _SPECIAL_CHARS_RE.sub('', name)
+    name = _SEPARATORS_RE.sub('_', name)
     return name.lower()
 
 
+TEMPLATE_PATH = os.path.join(os.path.dirname(__file__), '..', 'templates', 'grant_template.md')
+
+# Template placeholders and the format fields that replace them
+TEMPLATE_FIELDS = {
+    '[Unique identifier]': '{grant_id}',
+    '[Full name of the grant]': '{grant_name}',
+    '[Name of the funding organization]': '{funding_agency}',
+    # Only replace the main award amount, not budget placeholders
+    '- **Award Amount**: $[Amount]': '- **Award Amount**: ${award_amount}',
+    '[Research/Education/Infrastructure/etc.]': '{grant_type}',
+    '[Name]': '{pi_name}',
+    '[YYYY-MM-DD]': '{current_date}',
+}
+
+
+@lru_cache(maxsize=1)
+def load_template():
+    """Read the grant template once and convert its placeholders to format fields."""
+    with open(TEMPLATE_PATH, 'r') as f:
+        template = f.read()
+    
+    template = template.replace('{', '{{').replace('}', '}}')
+    for placeholder, format_field in TEMPLATE_FIELDS.items():
+        template = template.replace(placeholder, format_field)
+    return template
+
+
 def create_grant_file(grant_id, grant_name, funding_agency, award_amount, grant_type,
                       pi_name, output_dir='grants'):
     """Create a new grant information file from template."""
     
-    template_path = os.path.join(os.path.dirname(__file__), '..', 'templates', 'grant_template.md')
-    
     # Read template
     try:
-        with open(template_path, 'r') as f:
-            template = f.read()
+        template = load_template()
     except FileNotFoundError:
-        print(f"Error: Template file not found at {template_path}")
+        print(f"Error: Template file not found at {TEMPLATE_PATH}")
         sys.exit(1)
     
     # Replace placeholders
-    current_date = datetime.now().strftime('%Y-%m-%d')
-    content = template.replace('[Unique identifier]', grant_id)
-    content = content.replace('[Full name of the grant]', grant_name)
-    content = content.replace('[Name of the funding organization]', funding_agency)
-    # Only replace the main award amount, not budget placeholders
-    content = content.replace('- **Award Amount**: $[Amount]', f'- **Award Amount**: ${award_amount}')
-    content = content.replace('[Research/Education/Infrastructure/etc.]', grant_type)
-    content = content.replace('[Name]', pi_name)
-    content = content.replace('[YYYY-MM-DD]', current_date)
+    content = template.format_map({
+        'grant_id': grant_id,
+        'grant_name': grant_name,
+        'funding_agency': funding_agency,
+        'award_amount': award_amount,
+        'grant_type': grant_type,
+        'pi_name': pi_name,
+        'current_date': datetime.now().strftime('%Y-%m-%d'),
+    })
     
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
@@ -51,14 +81,51 @@ def create_grant_file(grant_id, grant_name, funding_agency, award_amount, grant_
     filename = f"{grant_id}_{sanitize_filename(grant_name)}.md"
     filepath = os.path.join(output_dir, filename)
     
-    # Write file
-    with open(filepath, 'w') as f:
-        f.write(content)
+    # Write file as a single encoded buffer
+    with open(filepath, 'wb') as f:
+        f.write(content.encode('utf-8'))
     
     print(f"✓ Grant file created successfully: {filepath}")
     return filepath
 
 
+# CSV column names (matching the command line flags) and their create_grant_file parameters
+CSV_COLUMNS = {
+    'id': 'grant_id',
+    'name': 'grant_name',
+    'agency': 'funding_agency',
+    'amount': 'award_amount',
+    'type': 'grant_type',
+    'pi': 'pi_name',
+}
+
+
+def create_grants_from_csv(csv_path, output_dir='grants'):
+    """Create a grant file for every row of a CSV file."""
+    created = []
+    
+    try:
+        with open(csv_path, newline='') as f:
+            reader = csv.DictReader(f)
+            missing = [column for column in CSV_COLUMNS if column not in (reader.fieldnames or [])]
+            if missing:
+                print(f"Error: CSV file is missing columns: {', '.join(missing)}")
+                sys.exit(1)
+            
+            for line_num, row in enumerate(reader, start=2):
+                values = {param: (row[column] or '').strip()
+                          for column, param in CSV_COLUMNS.items()}
+                if not all(values.values()):
+                    print(f"✗ Skipping line {line_num}: all fields are required")
+                    continue
+                created.append(create_grant_file(output_dir=output_dir, **values))
+    except FileNotFoundError:
+        print(f"Error: CSV file not found: {csv_path}")
+        sys.exit(1)
+    
+    return created
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Automate grant information file creation',
@@ -72,6 +139,9 @@ Examples:
   python3 add_grant.py --id NSF-2024-001 --name "AI Research Initiative" \\
     --agency "National Science Foundation" --amount 500000 \\
     --type Research --pi "Dr. Jane Smith"
+  
+  # Bulk mode from a CSV file with columns: id,name,agency,amount,type,pi
+  python3 add_grant.py --from-csv grants.csv
         """
     )
     
@@ -82,9 +152,16 @@ Examples:
     parser.add_argument('--type', help='Grant type (Research/Education/Infrastructure/etc.)')
     parser.add_argument('--pi', help='Principal Investigator name')
     parser.add_argument('--output-dir', default='grants', help='Output directory (default: grants)')
+    parser.add_argument('--from-csv', metavar='CSV_FILE',
+                       help='Create one grant file per row of a CSV file (columns: id,name,agency,amount,type,pi)')
     
     args = parser.parse_args()
     
+    if args.from_csv:
+        created = create_grants_from_csv(args.from_csv, args.output_dir)
+        print(f"\nCreated {len(created)} grant file(s) in {args.output_dir}")
+        return
+    
     # Interactive mode if no arguments provided
     if not args.id:
         print("=== Grant Information Entry ===\n")
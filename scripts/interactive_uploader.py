@@ -6,15 +6,23 @@ A user-friendly interface for selecting and uploading grant documents.
 
 import os
 import sys
+import stat
+import shlex
 from pathlib import Path
 from typing import List, Dict, Optional
 import subprocess
 
 # Add project paths
 project_root = Path(__file__).parent.parent
-sys.path.append(str(project_root / "scripts"))
+_PROJECT_ROOT_STR = str(project_root)
+_AI_SCRIPT = str(project_root / "ai_agents" / "ai_extraction_agent.py")
+_scripts_path = str(project_root / "scripts")
+if _scripts_path not in sys.path:
+    sys.path.append(_scripts_path)
 
-from upload_grant_documents import DocumentUploader
+from upload_grant_documents import DocumentUploader, FileCandidate, format_mb, _yes
+
+_SUPPORTED_EXTS = frozenset(ext.lstrip('.') for ext in DocumentUploader.SUPPORTED_FORMATS)
 
 
 class InteractiveUploader:
@@ -28,7 +36,13 @@ class InteractiveUploader:
     
     def clear_screen(self):
         """Clear the terminal screen."""
-        os.system('clear' if os.name == 'posix' else 'cls')
+        # Legacy Windows consoles without a TERM don't understand ANSI escapes
+        if os.name == 'nt' and os.environ.get('TERM') is None:
+            os.system('cls')
+            return
+        # Erase the display and home the cursor without spawning a shell
+        sys.stdout.write('\x1b[2J\x1b[H')
+        sys.stdout.flush()
     
     def print_header(self):
         """Print the application header."""
@@ -47,7 +61,7 @@ class InteractiveUploader:
         user_input = input(full_prompt).strip()
         return user_input if user_input else default
     
-    def browse_for_files(self) -> List[str]:
+    def browse_for_files(self) -> List[FileCandidate]:
         """Browse and select files for upload."""
         print("File Selection Methods:")
         print("1. Browse current directory")
@@ -62,7 +76,8 @@ class InteractiveUploader:
             return self.browse_directory(Path.cwd())
         elif choice == "2":
             path = self.get_user_input("Enter directory path", str(Path.home()))
-            return self.browse_directory(Path(path))
+            recurse = self.get_user_input("Include subdirectories? (y/n)", "n")
+            return self.browse_directory(Path(path), recurse=_yes(recurse))
         elif choice == "3":
             return self.manual_file_entry()
         elif choice == "4":
@@ -71,8 +86,8 @@ class InteractiveUploader:
             print("Invalid choice. Using current directory.")
             return self.browse_directory(Path.cwd())
     
-    def browse_directory(self, directory: Path) -> List[str]:
-        """Browse a directory and select files."""
+    def browse_directory(self, directory: Path, recurse: bool = False) -> List[FileCandidate]:
+        """Browse a directory, optionally including its subdirectories, and select files."""
         if not directory.exists() or not directory.is_dir():
             print(f"Error: Directory does not exist: {directory}")
             return []
@@ -82,29 +97,40 @@ class InteractiveUploader:
         
         # Get all files in directory
         all_files = []
-        supported_extensions = {'.pdf', '.docx', '.doc', '.txt', '.md'}
         
         try:
-            for item in directory.iterdir():
-                if item.is_file() and item.suffix.lower() in supported_extensions:
-                    all_files.append(item)
+            if recurse:
+                all_files = self._walk_supported_files(directory)
+            else:
+                # scandir entries know their file type without an extra stat per file
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        name = entry.name
+                        dot = name.rfind('.')
+                        # dot > 0 skips extension-less and hidden files, as splitext does
+                        if dot > 0 and name[dot + 1:].lower() in _SUPPORTED_EXTS and entry.is_file():
+                            # Stat once here; the size is carried to preview and upload
+                            all_files.append(FileCandidate.from_stat(entry.path, entry.stat()))
         except PermissionError:
             print(f"Permission denied accessing: {directory}")
             return []
         
         if not all_files:
             print("No supported files found in this directory.")
-            print(f"Supported formats: {', '.join(supported_extensions)}")
+            print(f"Supported formats: {', '.join(DocumentUploader.SUPPORTED_FORMATS)}")
             return []
         
-        # Sort files by name
-        all_files.sort(key=lambda x: x.name.lower())
+        # Sort files by name; recursive listings show paths relative to the root
+        root = str(directory)
+        def display_name(candidate: FileCandidate) -> str:
+            return os.path.relpath(candidate.path, root) if recurse else candidate.name
+        
+        all_files.sort(key=lambda x: display_name(x).lower())
         
         # Display files with numbers
         print("Available files:")
-        for i, file_path in enumerate(all_files, 1):
-            size_mb = file_path.stat().st_size / (1024 * 1024)
-            print(f"{i:2d}. {file_path.name} ({size_mb:.1f} MB)")
+        for i, candidate in enumerate(all_files, 1):
+            print(f"{i:2d}. {display_name(candidate)} ({format_mb(candidate.size)})")
         
         print(f"\n{len(all_files)} files found")
         print("Selection options:")
@@ -123,31 +149,69 @@ class InteractiveUploader:
         
         try:
             if selection.lower() == 'all':
-                selected_files = [str(f) for f in all_files]
+                selected_files = list(all_files)
             elif '-' in selection and ',' not in selection:
                 # Range selection
                 start, end = map(int, selection.split('-'))
                 start = max(1, min(start, len(all_files)))
                 end = max(start, min(end, len(all_files)))
-                selected_files = [str(all_files[i-1]) for i in range(start, end + 1)]
+                selected_files = [all_files[i-1] for i in range(start, end + 1)]
             else:
                 # Individual selections
                 indices = [int(x.strip()) for x in selection.split(',')]
                 for idx in indices:
                     if 1 <= idx <= len(all_files):
-                        selected_files.append(str(all_files[idx-1]))
+                        selected_files.append(all_files[idx-1])
         except ValueError:
             print("Invalid selection format. Please try again.")
-            return self.browse_directory(directory)
+            return self.browse_directory(directory, recurse)
         
         if selected_files:
             print(f"\nSelected {len(selected_files)} files:")
-            for file_path in selected_files:
-                print(f"  ✓ {Path(file_path).name}")
+            for candidate in selected_files:
+                print(f"  ✓ {candidate.name}")
         
         return selected_files
     
-    def manual_file_entry(self) -> List[str]:
+    def _existing_file(self, path_str: str,
+                       resolved: Dict[str, Optional[FileCandidate]]) -> Optional[FileCandidate]:
+        """Return a candidate if path_str names a regular file, memoized in resolved."""
+        if path_str in resolved:
+            return resolved[path_str]
+        
+        expanded = os.path.expanduser(path_str)
+        try:
+            file_stat = os.stat(expanded)
+        except OSError:
+            file_stat = None
+        
+        # abspath normalizes without resolve()'s per-component symlink walk;
+        # uploads copy the target either way, so symlinks need no resolving
+        candidate = None
+        if file_stat is not None and stat.S_ISREG(file_stat.st_mode):
+            candidate = FileCandidate.from_stat(os.path.abspath(expanded), file_stat)
+        resolved[path_str] = candidate
+        return candidate
+    
+    def _walk_supported_files(self, directory: Path) -> List[FileCandidate]:
+        """Collect supported files under a directory tree, skipping hidden directories."""
+        found = []
+        for root, dirs, files in os.walk(directory, followlinks=False):
+            # Prune hidden trees in place so os.walk never descends into them
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+            for name in files:
+                dot = name.rfind('.')
+                if dot > 0 and name[dot + 1:].lower() in _SUPPORTED_EXTS:
+                    path = os.path.join(root, name)
+                    try:
+                        file_stat = os.stat(path)
+                    except OSError:
+                        continue
+                    if stat.S_ISREG(file_stat.st_mode):
+                        found.append(FileCandidate.from_stat(path, file_stat))
+        return found
+    
+    def manual_file_entry(self) -> List[FileCandidate]:
         """Manually enter file paths."""
         print("\nManual File Entry")
         print("-" * 20)
@@ -156,26 +220,27 @@ class InteractiveUploader:
         print()
         
         files = []
+        resolved = {}
         while True:
             file_path = input(f"File {len(files) + 1}: ").strip()
             if not file_path:
                 break
             
             # Expand user path and resolve
-            full_path = Path(file_path).expanduser().resolve()
+            candidate = self._existing_file(file_path, resolved)
             
-            if full_path.exists() and full_path.is_file():
-                files.append(str(full_path))
-                print(f"  ✓ Added: {full_path.name}")
+            if candidate:
+                files.append(candidate)
+                print(f"  ✓ Added: {candidate.name}")
             else:
                 print(f"  ✗ File not found: {file_path}")
-                retry = self.get_user_input("Try again? (y/n)", "y").lower()
-                if retry in ['y', 'yes']:
+                retry = self.get_user_input("Try again? (y/n)", "y")
+                if _yes(retry):
                     continue
         
         return files
     
-    def drag_drop_entry(self) -> List[str]:
+    def drag_drop_entry(self) -> List[FileCandidate]:
         """Handle drag & drop file paths."""
         print("\nDrag & Drop / Paste Paths")
         print("-" * 25)
@@ -194,28 +259,32 @@ class InteractiveUploader:
         # Parse input - handle multiple files in one line or multiple lines
         file_paths = []
         for line in all_input:
-            # Split by spaces, but preserve quoted paths
-            import shlex
+            # Plain space-separated paths need no shell-style tokenizing
+            if not any(c in line for c in '"\'\\'):
+                file_paths.extend(line.split())
+                continue
+            
+            # Split by spaces, but preserve quoted and escaped paths
             try:
-                paths = shlex.split(line)
-                file_paths.extend(paths)
+                file_paths.extend(shlex.split(line))
             except ValueError:
                 # Fallback to simple split if shlex fails
                 file_paths.extend(line.split())
         
         # Validate and resolve paths
         valid_files = []
+        resolved = {}
         for path_str in file_paths:
-            full_path = Path(path_str).expanduser().resolve()
-            if full_path.exists() and full_path.is_file():
-                valid_files.append(str(full_path))
-                print(f"  ✓ Added: {full_path.name}")
+            candidate = self._existing_file(path_str, resolved)
+            if candidate:
+                valid_files.append(candidate)
+                print(f"  ✓ Added: {candidate.name}")
             else:
                 print(f"  ✗ File not found: {path_str}")
         
         return valid_files
     
-    def preview_files(self, files: List[str]) -> bool:
+    def preview_files(self, files: List[FileCandidate]) -> bool:
         """Preview selected files and confirm upload."""
         if not files:
             return False
@@ -227,26 +296,23 @@ class InteractiveUploader:
         total_size = 0
         valid_files = []
         
-        for file_path in files:
-            path = Path(file_path)
-            if path.exists():
-                size = path.stat().st_size
-                total_size += size
-                
-                # Validate file
-                is_valid, message = self.uploader.validate_file(file_path)
-                status = "✓" if is_valid else "✗"
-                
-                print(f"{status} {path.name}")
-                print(f"    Size: {size / (1024*1024):.1f} MB")
-                print(f"    Type: {path.suffix}")
-                if not is_valid:
-                    print(f"    Error: {message}")
-                else:
-                    valid_files.append(file_path)
-                print()
+        for candidate in files:
+            total_size += candidate.size
+            
+            # Validate file with the size captured at selection time
+            is_valid, message = self.uploader.validate_candidate(candidate)
+            status = "✓" if is_valid else "✗"
+            
+            print(f"{status} {candidate.name}")
+            print(f"    Size: {format_mb(candidate.size)}")
+            print(f"    Type: {candidate.ext}")
+            if not is_valid:
+                print(f"    Error: {message}")
+            else:
+                valid_files.append(candidate)
+            print()
         
-        print(f"Total size: {total_size / (1024*1024):.1f} MB")
+        print(f"Total size: {format_mb(total_size)}")
         print(f"Valid files: {len(valid_files)}/{len(files)}")
         
         if not valid_files:
@@ -258,7 +324,7 @@ class InteractiveUploader:
         
         confirm = self.get_user_input(f"\nProceed with uploading {len(valid_files)} files? (y/n)", "y")
         
-        if confirm.lower() in ['y', 'yes']:
+        if _yes(confirm):
             self.selected_files = valid_files
             return True
         
@@ -308,6 +374,7 @@ class InteractiveUploader:
         print("UPLOADING FILES")
         print(f"{'='*60}")
         
+        # Candidates carry their sizes, so uploading does not stat them again
         results = self.uploader.upload_multiple_files(self.selected_files, self.metadata)
         
         # Check results
@@ -346,23 +413,33 @@ class InteractiveUploader:
         
         process_now = self.get_user_input("Start AI processing now? (y/n)", "y")
         
-        if process_now.lower() in ['y', 'yes']:
+        if _yes(process_now):
             print("\nStarting AI processing...")
             try:
                 # Import and run AI processing
-                ai_script = project_root / "ai_agents" / "ai_extraction_agent.py"
-                result = subprocess.run([
-                    sys.executable, str(ai_script), "--process-all"
-                ], capture_output=True, text=True, cwd=str(project_root))
+                # Stream the agent's output as it runs instead of buffering it all
+                with subprocess.Popen([
+                    sys.executable, _AI_SCRIPT, "--process-all"
+                ], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+                   bufsize=1, cwd=_PROJECT_ROOT_STR,
+                   env={**os.environ, 'PYTHONUNBUFFERED': '1'}) as proc:
+                    try:
+                        for line in proc.stdout:
+                            print(line, end='')
+                        returncode = proc.wait()
+                    except KeyboardInterrupt:
+                        proc.terminate()
+                        proc.wait()
+                        print("\nAI processing cancelled.")
+                        return
                 
-                if result.returncode == 0:
+                if returncode == 0:
                     print("✓ AI processing completed successfully!")
                     print("\nTo view results:")
                     print(f"  python3 scripts/workflow_manager.py --summary")
                     print(f"  python3 scripts/workflow_manager.py --list-state extracted")
                 else:
-                    print("✗ AI processing encountered errors:")
-                    print(result.stderr)
+                    print("✗ AI processing encountered errors (see output above)")
                     
             except Exception as e:
                 print(f"✗ Error starting AI processing: {e}")
@@ -408,7 +485,7 @@ class InteractiveUploader:
                 if not files:
                     print("\nNo files selected.")
                     retry = self.get_user_input("Try again? (y/n)", "y")
-                    if retry.lower() not in ['y', 'yes']:
+                    if not _yes(retry):
                         break
                     continue
                 
@@ -435,12 +512,12 @@ class InteractiveUploader:
                     
                     # Ask if user wants to upload more files
                     another = self.get_user_input("\nUpload more files? (y/n)", "n")
-                    if another.lower() not in ['y', 'yes']:
+                    if not _yes(another):
                         break
                 else:
                     print("Upload failed. Please try again.")
                     retry = self.get_user_input("Try again? (y/n)", "y")
-                    if retry.lower() not in ['y', 'yes']:
+                    if not _yes(retry):
                         break
                         
         except KeyboardInterrupt:
@@ -5,89 +5,287 @@ Handles PDF, Word, and text file uploads and initiates AI processing.
 """
 
 import os
+import re
 import sys
+import stat
+import uuid
+import errno
 import shutil
+import hashlib
+import asyncio
 import argparse
+import threading
+import itertools
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional, Union
+from dataclasses import dataclass
 from datetime import datetime
 
 # Add ai_agents to path for imports
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'ai_agents'))
-sys.path.append(os.path.join(os.path.dirname(__file__)))
+_SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+for _path in (os.path.join(_SCRIPTS_DIR, '..', 'ai_agents'), _SCRIPTS_DIR):
+    if _path not in sys.path:
+        sys.path.append(_path)
 
 from workflow_manager import WorkflowManager, WorkflowState
 
 
+# Characters not allowed in stored filenames
+_UNSAFE_FILENAME_CHARS_RE = re.compile(r'[^\w\-. ]')
+# Answers accepted as yes at prompts
+_YES = frozenset(('y', 'yes', '1', 'true'))
+
+
+def _yes(answer: str, default: bool = False) -> bool:
+    """Interpret a yes/no answer, falling back to default when it is empty."""
+    answer = (answer or '').strip().lower()
+    return default if not answer else answer in _YES
+
+
+@dataclass(slots=True)
+class FileCandidate:
+    """A regular file selected for upload, with its size captured from one stat."""
+    path: str
+    size: int
+    ext: str
+    
+    @classmethod
+    def from_stat(cls, path: str, file_stat: os.stat_result) -> 'FileCandidate':
+        """Build a candidate from a path and its stat result."""
+        return cls(path, file_stat.st_size, os.path.splitext(path)[1].lower())
+    
+    @property
+    def name(self) -> str:
+        """Base filename for display."""
+        return os.path.basename(self.path)
+    
+    def __fspath__(self) -> str:
+        """Let candidates be passed wherever a path is accepted."""
+        return self.path
+
+
+def format_mb(size: int) -> str:
+    """Format a byte count as megabytes to one decimal place using integer math."""
+    tenths = (size * 10 + (1 << 19)) >> 20
+    return f"{tenths // 10}.{tenths % 10} MB"
+
+
+# Close descriptors on exec, and open in binary mode on Windows
+_OPEN_FLAGS = getattr(os, 'O_CLOEXEC', 0) | getattr(os, 'O_BINARY', 0)
+# Errors meaning an in-kernel copy is unsupported here, not that the copy failed
+_KERNEL_COPY_FALLBACK_ERRNOS = frozenset({
+    errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF, errno.ENOTSOCK,
+})
+# Errors meaning the filesystem cannot hard-link a staged upload into place
+_NO_HARD_LINK_ERRNOS = frozenset({errno.EPERM, errno.EOPNOTSUPP, errno.ENOSYS, errno.EMLINK})
+# Whether copied mode and timestamps can be applied through the open descriptor
+_FD_METADATA = os.utime in os.supports_fd and hasattr(os, 'fchmod')
+_COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def _sha256_fd(fd: int) -> str:
+    """Hash an open file from the start, through a duplicate of its descriptor."""
+    os.lseek(fd, 0, os.SEEK_SET)
+    with os.fdopen(os.dup(fd), 'rb', buffering=0) as f:
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: f.read(_COPY_CHUNK_SIZE), b''):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+
+def _copy_fd(src_fd: int, dst_fd: int, size: int):
+    """Copy size bytes between open descriptors, preferring in-kernel copies."""
+    offset = 0
+    if hasattr(os, 'copy_file_range'):
+        try:
+            while offset < size:
+                sent = os.copy_file_range(src_fd, dst_fd, size - offset, offset, offset)
+                if sent == 0:
+                    # No progress (e.g. the filesystem does not support it): try the next method
+                    break
+                offset += sent
+        except OSError as e:
+            # Cross-device or unsupported filesystem: try the next method
+            if e.errno not in _KERNEL_COPY_FALLBACK_ERRNOS:
+                raise
+        if offset >= size:
+            return
+    
+    os.lseek(dst_fd, offset, os.SEEK_SET)
+    if hasattr(os, 'sendfile'):
+        try:
+            while offset < size:
+                sent = os.sendfile(dst_fd, src_fd, offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+        except OSError as e:
+            if e.errno not in _KERNEL_COPY_FALLBACK_ERRNOS:
+                raise
+        if offset >= size:
+            return
+    
+    # Portable fallback through user space
+    os.lseek(src_fd, offset, os.SEEK_SET)
+    while offset < size:
+        chunk = os.read(src_fd, min(_COPY_CHUNK_SIZE, size - offset))
+        if not chunk:
+            break
+        view = memoryview(chunk)
+        while view:
+            view = view[os.write(dst_fd, view):]
+        offset += len(chunk)
+    if offset < size:
+        # The source shrank while it was copied
+        raise OSError(errno.EIO, f"Copied only {offset} of {size} bytes")
+
+
+def _fast_copy(src: str, dst: str, checksum: bool = False) -> Optional[str]:
+    """Copy file data in the kernel where possible, preserving metadata like copy2.
+    
+    The source is opened once; with checksum=True its SHA-256 is computed from
+    the same descriptor and returned.
+    """
+    sha256 = None
+    src_fd = os.open(src, os.O_RDONLY | _OPEN_FLAGS)
+    try:
+        src_stat = os.fstat(src_fd)
+        if checksum:
+            sha256 = _sha256_fd(src_fd)
+        dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | _OPEN_FLAGS, 0o666)
+        try:
+            _copy_fd(src_fd, dst_fd, src_stat.st_size)
+            if _FD_METADATA:
+                os.fchmod(dst_fd, stat.S_IMODE(src_stat.st_mode))
+                os.utime(dst_fd, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+        finally:
+            os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+    
+    if not _FD_METADATA:
+        shutil.copystat(src, dst)
+    return sha256
+
+
 class DocumentUploader:
     """Handles document uploads and initiates processing workflow."""
     
-    SUPPORTED_FORMATS = {'.pdf', '.docx', '.doc', '.txt', '.md'}
+    SUPPORTED_FORMATS = frozenset({'.pdf', '.docx', '.doc', '.txt', '.md'})
     MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB limit
+    MAX_UPLOAD_WORKERS = 16
+    PDF_METADATA_MAX_SIZE = 20 * 1024 * 1024  # Skip PDF metadata parsing above 20MB
     
-    def __init__(self, base_path: str = ".."):
-        """Initialize uploader with base repository path."""
+    def __init__(self, base_path: str = "..", quiet: bool = False, checksum: bool = False):
+        """Initialize uploader with base repository path.
+        
+        With quiet=True only batch summaries are printed, not per-file output.
+        With checksum=True each upload's SHA-256 is recorded in its metadata.
+        """
         self.base_path = Path(base_path).resolve()
+        self.quiet = quiet
+        self.checksum = checksum
         self.workflow_manager = WorkflowManager(str(self.base_path))
         self.intake_pending = self.base_path / "intake" / "pending"
         
+        # Serializes workflow registration and output when files are
+        # uploaded concurrently
+        self._lock = threading.Lock()
+        
         # Ensure directories exist
         self.intake_pending.mkdir(parents=True, exist_ok=True)
     
-    def validate_file(self, filepath: str) -> tuple[bool, str]:
-        """Validate uploaded file format and size."""
-        file_path = Path(filepath)
+    def validate_file(self, filepath: str,
+                      file_stat: Optional[os.stat_result] = None) -> tuple[bool, str]:
+        """Validate uploaded file format and size, reusing file_stat if already known."""
+        # Check if file exists (one stat also gives type and size)
+        if file_stat is None:
+            try:
+                file_stat = os.stat(filepath)
+            except OSError:
+                return False, f"File does not exist: {filepath}"
         
-        # Check if file exists
-        if not file_path.exists():
-            return False, f"File does not exist: {filepath}"
+        if not stat.S_ISREG(file_stat.st_mode):
+            return False, f"Not a regular file: {filepath}"
         
+        return self.validate_candidate(FileCandidate.from_stat(filepath, file_stat))
+    
+    def validate_candidate(self, candidate: FileCandidate) -> tuple[bool, str]:
+        """Validate format and size of a file whose stat is already known."""
         # Check file extension
-        if file_path.suffix.lower() not in self.SUPPORTED_FORMATS:
+        if candidate.ext not in self.SUPPORTED_FORMATS:
             return False, f"Unsupported file format. Supported: {', '.join(self.SUPPORTED_FORMATS)}"
         
         # Check file size
-        file_size = file_path.stat().st_size
+        file_size = candidate.size
         if file_size > self.MAX_FILE_SIZE:
-            return False, f"File too large ({file_size / 1024 / 1024:.1f}MB). Maximum: {self.MAX_FILE_SIZE / 1024 / 1024}MB"
-        
-        # Check if file is readable
-        try:
-            with open(filepath, 'rb') as f:
-                f.read(1024)  # Try to read first 1KB
-        except Exception as e:
-            return False, f"Cannot read file: {e}"
+            return False, f"File too large ({format_mb(file_size)}). Maximum: {format_mb(self.MAX_FILE_SIZE)}"
         
+        # Unreadable files are reported by the copy step
         return True, "File validation passed"
     
-    def generate_unique_filename(self, original_filename: str) -> str:
-        """Generate unique filename to avoid conflicts."""
-        base_name = Path(original_filename).stem
-        extension = Path(original_filename).suffix
+    def _candidate_filenames(self, original_filename: str) -> Iterator[str]:
+        """Yield the timestamped, cleaned name for a file, then counter-suffixed variants."""
+        base_name, extension = os.path.splitext(original_filename)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         # Clean the base name
-        clean_name = "".join(c for c in base_name if c.isalnum() or c in "-_. ")
-        clean_name = clean_name.replace(" ", "_")
+        clean_name = _UNSAFE_FILENAME_CHARS_RE.sub('', base_name).replace(" ", "_")
         
-        unique_name = f"{timestamp}_{clean_name}{extension}"
+        yield f"{timestamp}_{clean_name}{extension}"
+        for counter in itertools.count(1):
+            yield f"{timestamp}_{clean_name}_{counter}{extension}"
+    
+    def generate_unique_filename(self, original_filename: str) -> str:
+        """Generate a filename not yet used in the pending directory.
         
-        # Ensure uniqueness
-        counter = 1
-        while (self.intake_pending / unique_name).exists():
-            unique_name = f"{timestamp}_{clean_name}_{counter}{extension}"
-            counter += 1
+        The name is not reserved; uploads claim theirs when the copy is
+        complete (see _publish_upload).
+        """
+        return next(name for name in self._candidate_filenames(original_filename)
+                    if not (self.intake_pending / name).exists())
+    
+    def _staging_path(self) -> Path:
+        """Return a hidden path in the pending directory to copy an upload into."""
+        return self.intake_pending / f".{uuid.uuid4().hex}.upload"
+    
+    def _publish_upload(self, staged: Path, original_filename: str) -> str:
+        """Give a fully copied upload a unique name in the pending directory and return it.
         
-        return unique_name
+        Linking fails instead of replacing an existing file, so claiming the
+        name and making the complete file visible are a single step.
+        """
+        for name in self._candidate_filenames(original_filename):
+            destination = self.intake_pending / name
+            try:
+                os.link(staged, destination)
+            except FileExistsError:
+                continue
+            except OSError as e:
+                if e.errno not in _NO_HARD_LINK_ERRNOS:
+                    raise
+                # No hard links here: reserve the name, then replace the placeholder
+                try:
+                    os.close(os.open(destination, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644))
+                except FileExistsError:
+                    continue
+                os.replace(staged, destination)
+                return name
+            staged.unlink()
+            return name
     
-    def extract_metadata(self, filepath: str) -> Dict:
-        """Extract basic metadata from uploaded file."""
+    def extract_metadata(self, filepath: str, file_size: Optional[int] = None) -> Dict:
+        """Extract basic metadata from uploaded file, stat'ing it only if file_size is unknown."""
         file_path = Path(filepath)
-        stat = file_path.stat()
+        if file_size is None:
+            file_size = file_path.stat().st_size
         
         metadata = {
             'original_filename': file_path.name,
-            'file_size_bytes': stat.st_size,
+            'file_size_bytes': file_size,
             'file_extension': file_path.suffix.lower(),
             'upload_timestamp': datetime.now().isoformat(),
             'source_path': str(file_path.absolute())
@@ -95,91 +293,246 @@ class DocumentUploader:
         
         # Try to extract additional metadata based on file type
         if file_path.suffix.lower() == '.pdf':
-            try:
-                import PyPDF2
-                with open(filepath, 'rb') as f:
-                    reader = PyPDF2.PdfReader(f)
-                    metadata['pdf_pages'] = len(reader.pages)
-                    if reader.metadata:
-                        metadata['pdf_title'] = reader.metadata.get('/Title', '')
-                        metadata['pdf_author'] = reader.metadata.get('/Author', '')
-            except ImportError:
-                metadata['note'] = 'PyPDF2 not available for PDF metadata extraction'
-            except Exception as e:
-                metadata['pdf_error'] = str(e)
+            if file_size > self.PDF_METADATA_MAX_SIZE:
+                metadata['note'] = 'PDF metadata skipped for large file'
+            else:
+                metadata.update(self._extract_pdf_metadata(filepath))
         
         return metadata
     
-    def upload_file(self, filepath: str, custom_metadata: Dict = None) -> tuple[bool, str, str]:
-        """Upload a file to the intake system."""
+    @staticmethod
+    def _extract_pdf_metadata(filepath: str) -> Dict:
+        """Read page count, title and author without extracting page content."""
+        metadata = {}
+        try:
+            import fitz
+        except ImportError:
+            fitz = None
+        
+        try:
+            if fitz is not None:
+                # PyMuPDF reads the trailer and xref only; pages are loaded lazily
+                with fitz.open(filepath) as doc:
+                    metadata['pdf_pages'] = doc.page_count
+                    info = doc.metadata or {}
+                    if info:
+                        metadata['pdf_title'] = info.get('title', '')
+                        metadata['pdf_author'] = info.get('author', '')
+                return metadata
+            
+            import PyPDF2
+            with open(filepath, 'rb') as f:
+                reader = PyPDF2.PdfReader(f, strict=False)
+                metadata['pdf_pages'] = len(reader.pages)
+                if reader.metadata:
+                    metadata['pdf_title'] = reader.metadata.get('/Title', '')
+                    metadata['pdf_author'] = reader.metadata.get('/Author', '')
+        except ImportError:
+            metadata['note'] = 'PyMuPDF or PyPDF2 not available for PDF metadata extraction'
+        except Exception as e:
+            metadata['pdf_error'] = str(e)
+        
+        return metadata
+    
+    def _validate_upload(self, filepath: Union[str, FileCandidate]
+                         ) -> tuple[bool, str, Optional[FileCandidate]]:
+        """Validate a path or candidate, stat'ing only when the size is not yet known."""
+        if isinstance(filepath, FileCandidate):
+            return (*self.validate_candidate(filepath), filepath)
+        
+        try:
+            file_stat = os.stat(filepath)
+        except OSError:
+            return False, f"File does not exist: {filepath}", None
+        is_valid, message = self.validate_file(filepath, file_stat)
+        return is_valid, message, FileCandidate.from_stat(filepath, file_stat)
+    
+    def upload_file(self, filepath: Union[str, FileCandidate], custom_metadata: Dict = None,
+                    deferred_registrations: Optional[List] = None) -> tuple[bool, str, str]:
+        """Upload a file to the intake system.
+        
+        filepath may be a FileCandidate whose size is already known. If
+        deferred_registrations is given, the (destination, metadata) pair is
+        appended to it instead of being registered with the workflow manager.
+        """
         # Validate file
-        is_valid, message = self.validate_file(filepath)
+        is_valid, message, candidate = self._validate_upload(filepath)
         if not is_valid:
             return False, message, ""
+        filepath = candidate.path
         
         try:
-            # Generate unique filename
+            # Copy to a hidden file, hashing it from the same descriptor, then
+            # give it a unique name, so pending only ever lists complete uploads
             original_filename = Path(filepath).name
-            unique_filename = self.generate_unique_filename(original_filename)
+            staged = self._staging_path()
+            try:
+                sha256 = _fast_copy(filepath, str(staged), self.checksum)
+                unique_filename = self._publish_upload(staged, original_filename)
+            finally:
+                staged.unlink(missing_ok=True)
             destination = self.intake_pending / unique_filename
             
-            # Copy file to intake directory
-            shutil.copy2(filepath, destination)
-            
             # Extract metadata
-            metadata = self.extract_metadata(filepath)
+            metadata = self.extract_metadata(filepath, candidate.size)
+            if sha256:
+                metadata['sha256'] = sha256
             if custom_metadata:
                 metadata.update(custom_metadata)
             
-            # Register with workflow manager
-            self.workflow_manager.register_document(str(destination), metadata)
-            
-            print(f"✓ Uploaded: {original_filename} → {unique_filename}")
-            print(f"  Location: {destination}")
-            print(f"  Size: {metadata['file_size_bytes'] / 1024:.1f} KB")
+            with self._lock:
+                # Register with workflow manager
+                if deferred_registrations is not None:
+                    deferred_registrations.append((str(destination), metadata))
+                else:
+                    self.workflow_manager.register_documents(
+                        [(str(destination), metadata)], quiet=self.quiet
+                    )
+                
+                self._report_upload(original_filename, unique_filename, destination, metadata)
             
             return True, f"File uploaded successfully as {unique_filename}", unique_filename
             
         except Exception as e:
             error_msg = f"Upload failed: {e}"
-            print(f"✗ {error_msg}")
+            if not self.quiet:
+                with self._lock:
+                    print(f"✗ {error_msg}")
             return False, error_msg, ""
     
-    def upload_multiple_files(self, filepaths: List[str], 
+    def _report_upload(self, original_filename: str, unique_filename: str,
+                       destination: Path, metadata: Dict):
+        """Print the result of one upload in a single write."""
+        if not self.quiet:
+            sys.stdout.write(
+                f"✓ Uploaded: {original_filename} → {unique_filename}\n"
+                f"  Location: {destination}\n"
+                f"  Size: {metadata['file_size_bytes'] / 1024:.1f} KB\n"
+            )
+    
+    @staticmethod
+    def _print_upload_summary(results: Dict[str, tuple[bool, str, str]]):
+        """Print the totals for a batch upload."""
+        successful = sum(1 for success, _, _ in results.values() if success)
+        sys.stdout.write(
+            f"\n=== Upload Summary ===\n"
+            f"Total files: {len(results)}\n"
+            f"Successful: {successful}\n"
+            f"Failed: {len(results) - successful}\n"
+        )
+    
+    def upload_multiple_files(self, filepaths: List[Union[str, FileCandidate]], 
                             custom_metadata: Dict = None) -> Dict[str, tuple[bool, str, str]]:
-        """Upload multiple files at once."""
+        """Upload multiple files at once, keying results by path."""
         results = {}
         
-        print(f"Uploading {len(filepaths)} files...")
+        if not self.quiet:
+            print(f"Uploading {len(filepaths)} files...")
+        
+        # Copies are I/O bound, so overlap them across threads
+        registrations = []
+        max_workers = max(1, min(self.MAX_UPLOAD_WORKERS, len(filepaths)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            outcomes = executor.map(
+                lambda filepath: self.upload_file(filepath, custom_metadata, registrations),
+                filepaths
+            )
+            for filepath, outcome in zip(filepaths, outcomes):
+                results[os.fspath(filepath)] = outcome
         
-        for filepath in filepaths:
-            print(f"\nProcessing: {Path(filepath).name}")
-            success, message, filename = self.upload_file(filepath, custom_metadata)
-            results[filepath] = (success, message, filename)
+        # Register the whole batch with one workflow status rewrite
+        if registrations:
+            self.workflow_manager.register_documents(registrations, quiet=self.quiet)
         
         # Summary
-        successful = sum(1 for success, _, _ in results.values() if success)
-        print(f"\n=== Upload Summary ===")
-        print(f"Total files: {len(filepaths)}")
-        print(f"Successful: {successful}")
-        print(f"Failed: {len(filepaths) - successful}")
+        self._print_upload_summary(results)
         
         return results
     
+    async def _upload_file_async(self, filepath: Union[str, FileCandidate],
+                                 custom_metadata: Optional[Dict],
+                                 registrations: List, semaphore: asyncio.Semaphore
+                                 ) -> tuple[bool, str, str]:
+        """Upload one file, copying it and reading its metadata concurrently."""
+        async with semaphore:
+            # Validate file
+            is_valid, message, candidate = await asyncio.to_thread(
+                self._validate_upload, filepath
+            )
+            if not is_valid:
+                return False, message, ""
+            filepath = candidate.path
+            
+            try:
+                original_filename = Path(filepath).name
+                staged = self._staging_path()
+                try:
+                    # Both stages only read the source, so overlap them
+                    sha256, metadata = await asyncio.gather(
+                        asyncio.to_thread(_fast_copy, filepath, str(staged), self.checksum),
+                        asyncio.to_thread(self.extract_metadata, filepath, candidate.size),
+                        return_exceptions=True
+                    )
+                    if isinstance(sha256, BaseException):
+                        raise sha256
+                    if isinstance(metadata, BaseException):
+                        raise metadata
+                    unique_filename = await asyncio.to_thread(
+                        self._publish_upload, staged, original_filename
+                    )
+                finally:
+                    staged.unlink(missing_ok=True)
+                destination = self.intake_pending / unique_filename
+                if sha256:
+                    metadata['sha256'] = sha256
+                if custom_metadata:
+                    metadata.update(custom_metadata)
+                
+                registrations.append((str(destination), metadata))
+                self._report_upload(original_filename, unique_filename, destination, metadata)
+                return True, f"File uploaded successfully as {unique_filename}", unique_filename
+                
+            except Exception as e:
+                error_msg = f"Upload failed: {e}"
+                if not self.quiet:
+                    print(f"✗ {error_msg}")
+                return False, error_msg, ""
+    
+    async def upload_many_async(self, filepaths: List[Union[str, FileCandidate]], custom_metadata: Dict = None,
+                                max_concurrent: int = 8) -> Dict[str, tuple[bool, str, str]]:
+        """Upload multiple files through an asyncio pipeline of worker threads."""
+        if not self.quiet:
+            print(f"Uploading {len(filepaths)} files...")
+        
+        registrations = []
+        semaphore = asyncio.Semaphore(max(1, max_concurrent))
+        outcomes = await asyncio.gather(*(
+            self._upload_file_async(filepath, custom_metadata, registrations, semaphore)
+            for filepath in filepaths
+        ))
+        results = dict(zip(map(os.fspath, filepaths), outcomes))
+        
+        # Register the whole batch with one workflow status rewrite
+        if registrations:
+            await asyncio.to_thread(
+                self.workflow_manager.register_documents, registrations, self.quiet
+            )
+        
+        self._print_upload_summary(results)
+        return results
+    
     def list_pending_files(self) -> List[str]:
-        """List files currently in pending state."""
-        pending_files = []
-        if self.intake_pending.exists():
-            for file_path in self.intake_pending.iterdir():
-                if file_path.is_file():
-                    pending_files.append(file_path.name)
-        return sorted(pending_files)
+        """List files currently in pending state, oldest arrival first."""
+        # Reads the pending directory directly, without loading workflow status
+        return self.workflow_manager.list_filenames_in_state(WorkflowState.PENDING)
     
     def trigger_ai_processing(self, filename: str = None) -> bool:
         """Trigger AI processing for uploaded files."""
         try:
             # Import here to avoid circular imports
-            sys.path.append(str(self.base_path / "ai_agents"))
+            ai_agents_path = str(self.base_path / "ai_agents")
+            if ai_agents_path not in sys.path:
+                sys.path.append(ai_agents_path)
             
             if filename:
                 # Process specific file
@@ -200,13 +553,11 @@ class DocumentUploader:
                     return True
                 
                 print(f"Triggering AI processing for {len(pending_files)} files...")
-                success_count = 0
-                
-                for file in pending_files:
-                    if self.workflow_manager.move_document(
-                        file, WorkflowState.PENDING, WorkflowState.PROCESSING
-                    ):
-                        success_count += 1
+                # Move every file, then record all transitions with one status save
+                success_count = len(self.workflow_manager.move_documents([
+                    (file, WorkflowState.PENDING, WorkflowState.PROCESSING)
+                    for file in pending_files
+                ]))
                 
                 print(f"✓ Moved {success_count}/{len(pending_files)} files to processing")
                 return success_count == len(pending_files)
@@ -229,6 +580,15 @@ Examples:
   # Upload multiple files
   python3 upload_grant_documents.py --file file1.pdf --file file2.docx
   
+  # Upload through the asyncio pipeline (helps on network-mounted storage)
+  python3 upload_grant_documents.py --async --file file1.pdf --file file2.docx
+  
+  # Upload quietly, printing only the summary
+  python3 upload_grant_documents.py --quiet --file file1.pdf --file file2.docx
+  
+  # Record a SHA-256 checksum for each uploaded file
+  python3 upload_grant_documents.py --checksum --file grant.pdf
+  
   # Upload with custom metadata
   python3 upload_grant_documents.py --file grant.pdf --agency "NSF" --year "2024"
   
@@ -251,11 +611,17 @@ Examples:
                        help='Trigger AI processing for all pending files')
     parser.add_argument('--process-file', 
                        help='Trigger AI processing for specific file')
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                       help='Upload files through the asyncio pipeline')
+    parser.add_argument('--quiet', action='store_true',
+                       help='Suppress per-file output and print only the upload summary')
+    parser.add_argument('--checksum', action='store_true',
+                       help='Record a SHA-256 checksum of each file in its metadata')
     
     args = parser.parse_args()
     
     # Initialize uploader
-    uploader = DocumentUploader()
+    uploader = DocumentUploader(quiet=args.quiet, checksum=args.checksum)
     
     if args.list_pending:
         pending_files = uploader.list_pending_files()
@@ -289,7 +655,10 @@ Examples:
         custom_metadata['grant_type'] = args.type
     
     # Upload files
-    results = uploader.upload_multiple_files(args.file, custom_metadata)
+    if args.use_async:
+        results = asyncio.run(uploader.upload_many_async(args.file, custom_metadata))
+    else:
+        results = uploader.upload_multiple_files(args.file, custom_metadata)
     
     # Check for failures
     failed_files = [filepath for filepath, (success, _, _) in results.items() if not success]
@@ -302,8 +671,8 @@ Examples:
     
     # Ask if user wants to trigger processing
     if len(results) > 0:
-        response = input("\nTrigger AI processing now? (y/n): ").strip().lower()
-        if response in ['y', 'yes']:
+        response = input("\nTrigger AI processing now? (y/n): ")
+        if _yes(response):
             uploader.trigger_ai_processing()
 
 
@@ -6,13 +6,33 @@ Handles state transitions and tracks document processing status.
 
 import os
 import json
+import errno
+import heapq
+import marshal
 import shutil
+import sys
+from collections import Counter
+from contextlib import contextmanager
+from functools import lru_cache, wraps
 from datetime import datetime
+from itertools import islice
+from operator import attrgetter
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows; status files are then only guarded within a process
+    fcntl = None
+
 
 class WorkflowState(Enum):
     """Enumeration of workflow states."""
@@ -25,7 +45,7 @@ class WorkflowState(Enum):
     ERROR = "error"
 
 
-@dataclass
+@dataclass(slots=True)
 class DocumentInfo:
     """Information about a document in the workflow."""
     filename: str
@@ -37,8 +57,93 @@ class DocumentInfo:
     error_message: Optional[str] = None
 
 
+def _document_to_dict(doc_info: DocumentInfo) -> Dict:
+    """Convert a DocumentInfo to its JSON-serializable form."""
+    return {
+        'filename': doc_info.filename,
+        'original_path': doc_info.original_path,
+        'current_state': doc_info.current_state.value,
+        'created_at': doc_info.created_at.isoformat(),
+        'updated_at': doc_info.updated_at.isoformat(),
+        'metadata': doc_info.metadata,
+        'error_message': doc_info.error_message
+    }
+
+
+def _json_default(obj):
+    """Serialize DocumentInfo, enums and datetimes for the stdlib json fallback."""
+    if isinstance(obj, DocumentInfo):
+        return _document_to_dict(obj)
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dumps(obj, indent: bool = False) -> bytes:
+    """Serialize status data to JSON bytes."""
+    if orjson is not None:
+        # orjson serializes dataclasses, enums and datetimes natively
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, default=_json_default, indent=2 if indent else None).encode()
+
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+# Bound lookups used for every row when loading status. Timestamps repeat
+# across documents registered or transitioned together, and datetimes are
+# immutable, so parsed values can be shared.
+_state_from_value = WorkflowState._value2member_map_.__getitem__
+_parse_timestamp = lru_cache(maxsize=4096)(datetime.fromisoformat)
+
+
+def _document_from_dict(data: Dict) -> DocumentInfo:
+    """Rebuild a DocumentInfo from its JSON form."""
+    return DocumentInfo(
+        filename=data['filename'],
+        original_path=data['original_path'],
+        current_state=_state_from_value(data['current_state']),
+        created_at=_parse_timestamp(data['created_at']),
+        updated_at=_parse_timestamp(data['updated_at']),
+        metadata=data['metadata'],
+        error_message=data.get('error_message')
+    )
+
+
+def _atomic_write_bytes(path: Path, data: bytes):
+    """Write a file via a temporary sibling and rename, so readers never see partial data."""
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _exclusive(method):
+    """Run a WorkflowManager method while holding the status lock exclusively."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._status_lock(exclusive=True):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class WorkflowManager:
-    """Manages grant processing workflow states and transitions."""
+    """Manages grant processing workflow states and transitions.
+    
+    Status is kept as a JSON snapshot plus an append-only JSONL event log;
+    registrations and transitions only append to the log, and the log is
+    folded into the snapshot by compact(). An advisory lock on
+    workflow_status.lock is held exclusively while the files are changed
+    and shared while they are read, so processes never interleave.
+    """
+    
+    # Compact the event log into the snapshot once it holds this many events
+    COMPACT_THRESHOLD = 10000
     
     def __init__(self, base_path: str = "."):
         """Initialize workflow manager with base repository path."""
@@ -55,167 +160,529 @@ class WorkflowManager:
             WorkflowState.VALIDATED: self.workflows_path / "validated",
             WorkflowState.APPROVED: self.workflows_path / "approved",
         }
+        # String prefixes for building file paths without Path objects in move loops
+        self._state_dir_strs = {state: str(path) + os.sep
+                                for state, path in self.state_dirs.items()}
         
-        # Workflow status file
+        # Workflow status snapshot and the event log written since it
         self.status_file = self.workflows_path / "workflow_status.json"
+        self.events_file = self.workflows_path / "workflow_events.jsonl"
+        self.lock_file = self.workflows_path / "workflow_status.lock"
+        # Marshalled copy of the snapshot, faster to load than the JSON kept for
+        # humans; marshal only rebuilds builtin values, so loading cannot run code
+        self.status_cache_file = self.workflows_path / "workflow_status.marshal"
+        
+        # Parsed status, the (mtime, size, inode) of the snapshot it was read
+        # from and how many bytes of the event log have been applied to it
+        self._status_cache = None
+        self._snapshot_signature = None
+        self._log_size = 0
+        self._event_count = 0
+        # Hash of the last snapshot this instance wrote, to skip identical rewrites
+        self._saved_hash = None
+        # Nesting depth and mode of the status lock held by this instance
+        self._lock_depth = 0
+        self._lock_exclusive = False
+        
+        # Documents grouped by state, oldest first, built from one cached status
+        # dict; states whose order was disturbed are re-sorted on next use
+        self._by_state = None
+        self._by_state_source = None
+        self._unsorted_states = set()
+    
+    @staticmethod
+    def _file_signature(path: Path) -> Optional[Tuple[int, int, int]]:
+        """Return a file's (mtime_ns, size, inode), or None if it does not exist."""
+        try:
+            file_stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return file_stat.st_mtime_ns, file_stat.st_size, file_stat.st_ino
+    
+    @contextmanager
+    def _status_lock(self, exclusive: bool = False):
+        """Hold the advisory lock on the status files; nested use reuses the outer lock."""
+        if self._lock_depth:
+            if exclusive and not self._lock_exclusive:
+                raise RuntimeError("Cannot upgrade a shared workflow status lock")
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+            return
+        
+        lock_fd = None
+        if fcntl is not None:
+            try:
+                lock_fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o666)
+            except FileNotFoundError:
+                # No workflows directory, so no status files to guard
+                pass
+            else:
+                try:
+                    fcntl.flock(lock_fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+                except BaseException:
+                    os.close(lock_fd)
+                    raise
+        self._lock_depth, self._lock_exclusive = 1, exclusive
+        try:
+            yield
+        finally:
+            self._lock_depth, self._lock_exclusive = 0, False
+            if lock_fd is not None:
+                # Closing the descriptor releases the lock
+                os.close(lock_fd)
         
     def get_workflow_status(self) -> Dict[str, DocumentInfo]:
-        """Load workflow status from file."""
-        if not self.status_file.exists():
-            return {}
-            
+        """Load workflow status from file, reusing the cached copy if it is unchanged.
+        
+        The returned dict and its DocumentInfo objects are this manager's
+        cache and state index; treat them as read-only and change status
+        through the register, transition and move methods.
+        """
+        with self._status_lock():
+            return self._read_status()
+    
+    def _read_status(self) -> Dict[str, DocumentInfo]:
+        """Load or refresh the cached status; the caller holds the status lock.
+        
+        Under the lock the event log only grows until a compaction, and a
+        compaction always replaces the snapshot. So while the snapshot is
+        unchanged, only the log past the cached size needs to be applied.
+        """
+        snapshot_signature = self._file_signature(self.status_file)
         try:
-            with open(self.status_file, 'r') as f:
-                status_data = json.load(f)
+            log_size = os.stat(self.events_file).st_size
+        except FileNotFoundError:
+            log_size = 0
+        
+        if (self._status_cache is not None and snapshot_signature == self._snapshot_signature
+                and log_size >= self._log_size):
+            if log_size > self._log_size:
+                self._event_count += self._replay_events(self._status_cache,
+                                                         self._log_size, log_size)
+                self._log_size = log_size
+            return self._status_cache
+        
+        # Convert back to DocumentInfo objects. Snapshots are replaced atomically,
+        # so an unreadable one is a real error rather than a partial write, and
+        # treating it as empty would let the next compaction erase all status.
+        workflow_status = {}
+        if snapshot_signature is not None:
+            workflow_status = self._load_snapshot_cache(snapshot_signature[0])
+            if workflow_status is None:
+                try:
+                    status_data = _loads(self.status_file.read_bytes())
+                    workflow_status = {filename: _document_from_dict(data)
+                                       for filename, data in status_data.items()}
+                except (ValueError, KeyError, TypeError) as e:
+                    raise ValueError(
+                        f"Could not load workflow status from {self.status_file}: {e}"
+                    ) from e
+        
+        # Replay changes recorded since the snapshot
+        self._event_count = self._replay_events(workflow_status, 0, log_size) if log_size else 0
+        
+        self._status_cache = workflow_status
+        self._snapshot_signature = snapshot_signature
+        self._log_size = log_size
+        return workflow_status
+    
+    def _load_snapshot_cache(self, json_mtime_ns: int) -> Optional[Dict[str, DocumentInfo]]:
+        """Load the marshalled snapshot if it is at least as new as the JSON one."""
+        try:
+            if os.stat(self.status_cache_file).st_mtime_ns < json_mtime_ns:
+                return None
+        except FileNotFoundError:
+            return None
+        try:
+            rows = marshal.loads(self.status_cache_file.read_bytes())
+            if not isinstance(rows, dict) or not all(
+                    type(row) is tuple and len(row) == 7
+                    and row[2] in WorkflowState._value2member_map_
+                    for row in rows.values()):
+                raise ValueError("unexpected status cache layout")
+            return {filename: DocumentInfo(name, original_path, _state_from_value(state),
+                                           _parse_timestamp(created_at),
+                                           _parse_timestamp(updated_at),
+                                           metadata, error_message)
+                    for filename, (name, original_path, state, created_at, updated_at,
+                                   metadata, error_message) in rows.items()}
+        except Exception:
+            # Unreadable or foreign cache: drop it and use the JSON snapshot
+            self.status_cache_file.unlink(missing_ok=True)
+            return None
+    
+    def _replay_events(self, workflow_status: Dict[str, DocumentInfo],
+                       start: int, end: int) -> int:
+        """Apply the event log between two byte offsets and return the number of events."""
+        with open(self.events_file, 'rb') as f:
+            f.seek(start)
+            data = f.read(end - start)
+        
+        count = 0
+        for line in data.splitlines():
+            try:
+                event = _loads(line)
+            except ValueError:
+                # A torn final line from an interrupted write
+                print(f"Warning: Skipping malformed workflow event: {line.strip()[:80]!r}")
+                continue
+            count += 1
             
-            # Convert back to DocumentInfo objects
-            workflow_status = {}
-            for filename, data in status_data.items():
-                workflow_status[filename] = DocumentInfo(
-                    filename=data['filename'],
-                    original_path=data['original_path'],
-                    current_state=WorkflowState(data['current_state']),
-                    created_at=datetime.fromisoformat(data['created_at']),
-                    updated_at=datetime.fromisoformat(data['updated_at']),
-                    metadata=data['metadata'],
-                    error_message=data.get('error_message')
-                )
-            return workflow_status
+            if event['event'] == 'register':
+                doc_info = _document_from_dict(event['document'])
+                previous = workflow_status.get(doc_info.filename)
+                workflow_status[doc_info.filename] = doc_info
+                self._index_document(workflow_status, doc_info,
+                                     previous.current_state if previous else None)
+            elif event['event'] == 'transition':
+                doc_info = workflow_status.get(event['filename'])
+                if doc_info is not None:
+                    old_state = doc_info.current_state
+                    doc_info.current_state = _state_from_value(event['state'])
+                    doc_info.updated_at = _parse_timestamp(event['ts'])
+                    doc_info.error_message = event['error']
+                    self._index_document(workflow_status, doc_info, old_state)
+        return count
+    
+    def _append_events(self, workflow_status: Dict[str, DocumentInfo], events: List[Dict]):
+        """Append events to the log after they have been applied to workflow_status.
+        
+        The caller holds the status lock exclusively and read workflow_status
+        under it, so the in-memory copy stays current.
+        """
+        payload = b"".join(_dumps(event) + b"\n" for event in events)
+        try:
+            with open(self.events_file, 'ab') as f:
+                f.write(payload)
         except Exception as e:
-            print(f"Warning: Could not load workflow status: {e}")
-            return {}
+            print(f"Error saving workflow status: {e}")
+            self._status_cache = None
+            return
+        
+        self._event_count += len(events)
+        self._log_size += len(payload)
+        
+        if self._event_count >= self.COMPACT_THRESHOLD:
+            self.save_workflow_status(workflow_status)
     
+    @_exclusive
     def save_workflow_status(self, workflow_status: Dict[str, DocumentInfo]):
-        """Save workflow status to file."""
-        # Convert DocumentInfo objects to serializable format
-        status_data = {}
-        for filename, doc_info in workflow_status.items():
-            status_data[filename] = {
-                'filename': doc_info.filename,
-                'original_path': doc_info.original_path,
-                'current_state': doc_info.current_state.value,
-                'created_at': doc_info.created_at.isoformat(),
-                'updated_at': doc_info.updated_at.isoformat(),
-                'metadata': doc_info.metadata,
-                'error_message': doc_info.error_message
-            }
+        """Save a full workflow status snapshot and clear the event log.
+        
+        workflow_status must be the status returned by get_workflow_status();
+        ValueError is raised if other processes changed the status since, as
+        saving it would discard their changes.
+        """
+        if self._read_status() is not workflow_status:
+            raise ValueError(f"Workflow status in {self.workflows_path} changed "
+                             f"since it was read; reload it before saving")
+        
+        payload = _dumps(workflow_status, indent=True)
+        payload_hash = hash(payload)
+        
+        # Nothing to do if this exact snapshot is already on disk with no log after it
+        if (payload_hash == self._saved_hash and self._snapshot_signature is not None
+                and not self._log_size):
+            return
         
         try:
-            with open(self.status_file, 'w') as f:
-                json.dump(status_data, f, indent=2)
+            _atomic_write_bytes(self.status_file, payload)
+            # Written after the JSON so its mtime marks it as current
+            try:
+                cache_payload = marshal.dumps({
+                    filename: (doc_info.filename, doc_info.original_path,
+                               doc_info.current_state.value, doc_info.created_at.isoformat(),
+                               doc_info.updated_at.isoformat(), doc_info.metadata,
+                               doc_info.error_message)
+                    for filename, doc_info in workflow_status.items()
+                })
+            except ValueError:
+                # Metadata marshal cannot store; the JSON snapshot is used alone
+                self.status_cache_file.unlink(missing_ok=True)
+            else:
+                _atomic_write_bytes(self.status_cache_file, cache_payload)
+            # The snapshot now includes every logged event
+            self.events_file.unlink(missing_ok=True)
         except Exception as e:
             print(f"Error saving workflow status: {e}")
+            self._status_cache = None
+            return
+        
+        self._event_count = 0
+        self._saved_hash = payload_hash
+        self._status_cache = workflow_status
+        self._snapshot_signature = self._file_signature(self.status_file)
+        self._log_size = 0
+        # The dict may have been changed outside this class, so re-index it
+        self._by_state_source = None
+    
+    @_exclusive
+    def compact(self):
+        """Fold the event log into the status snapshot."""
+        self.save_workflow_status(self._read_status())
+    
+    def _state_index(self) -> Dict[WorkflowState, Dict[str, DocumentInfo]]:
+        """Return documents grouped by state, rebuilding the index if the status changed."""
+        workflow_status = self.get_workflow_status()
+        if self._by_state_source is not workflow_status:
+            by_state = {state: {} for state in WorkflowState}
+            for doc_info in sorted(workflow_status.values(), key=attrgetter('created_at')):
+                by_state[doc_info.current_state][doc_info.filename] = doc_info
+            self._by_state = by_state
+            self._by_state_source = workflow_status
+            self._unsorted_states.clear()
+        return self._by_state
+    
+    def _index_document(self, workflow_status: Dict[str, DocumentInfo],
+                        doc_info: DocumentInfo, old_state: Optional[WorkflowState] = None):
+        """Move a document into its current state's index bucket."""
+        if self._by_state_source is not workflow_status:
+            return
+        if old_state is not None:
+            self._by_state[old_state].pop(doc_info.filename, None)
+        bucket = self._by_state[doc_info.current_state]
+        if bucket and next(reversed(bucket.values())).created_at > doc_info.created_at:
+            self._unsorted_states.add(doc_info.current_state)
+        bucket[doc_info.filename] = doc_info
+    
+    def _documents_in_state(self, state: WorkflowState) -> Dict[str, DocumentInfo]:
+        """Return the index bucket for a state, ordered by creation time."""
+        index = self._state_index()
+        if state in self._unsorted_states:
+            index[state] = dict(sorted(index[state].items(),
+                                       key=lambda item: item[1].created_at))
+            self._unsorted_states.discard(state)
+        return index[state]
     
     def register_document(self, filepath: str, metadata: Dict = None) -> str:
         """Register a new document in the workflow."""
-        if metadata is None:
-            metadata = {}
-            
-        filename = Path(filepath).name
+        return self.register_documents([(filepath, metadata)])[0]
+    
+    @_exclusive
+    def register_documents(self, documents: List[Tuple[str, Optional[Dict]]],
+                           quiet: bool = False) -> List[str]:
+        """Register several documents with a single status load and log write."""
         current_time = datetime.now()
         
-        # Create document info
-        doc_info = DocumentInfo(
-            filename=filename,
-            original_path=filepath,
-            current_state=WorkflowState.PENDING,
-            created_at=current_time,
-            updated_at=current_time,
-            metadata=metadata
-        )
-        
-        # Load existing status and add new document
+        # Load existing status and add new documents
         workflow_status = self.get_workflow_status()
-        workflow_status[filename] = doc_info
-        self.save_workflow_status(workflow_status)
+        filenames = []
+        events = []
+        for filepath, metadata in documents:
+            filename = Path(filepath).name
+            
+            # Create document info
+            doc_info = DocumentInfo(
+                filename=filename,
+                original_path=filepath,
+                current_state=WorkflowState.PENDING,
+                created_at=current_time,
+                updated_at=current_time,
+                metadata=metadata if metadata is not None else {}
+            )
+            previous = workflow_status.get(filename)
+            workflow_status[filename] = doc_info
+            self._index_document(workflow_status, doc_info,
+                                 previous.current_state if previous else None)
+            filenames.append(filename)
+            events.append({'ts': current_time, 'event': 'register', 'document': doc_info})
+        
+        if events:
+            self._append_events(workflow_status, events)
         
-        print(f"✓ Registered document: {filename}")
-        return filename
+        if not quiet and filenames:
+            print("\n".join(f"✓ Registered document: {filename}" for filename in filenames))
+        return filenames
     
     def transition_state(self, filename: str, new_state: WorkflowState, 
                         error_message: str = None) -> bool:
         """Transition a document to a new workflow state."""
+        return bool(self.transition_states([(filename, new_state, error_message)]))
+    
+    @_exclusive
+    def transition_states(self, updates: List[Tuple[str, WorkflowState, Optional[str]]],
+                          quiet: bool = False) -> List[str]:
+        """Apply several state transitions with a single status load and log write.
+        
+        Each update is (filename, new_state, error_message). Returns the
+        filenames that were transitioned.
+        """
         workflow_status = self.get_workflow_status()
+        current_time = datetime.now()
+        
+        transitioned = []
+        unchanged = []
+        for filename, new_state, error_message in updates:
+            previous = self._apply_transition(workflow_status, filename, new_state,
+                                              error_message, current_time)
+            if previous == (new_state, error_message):
+                unchanged.append(filename)
+            elif previous is not None:
+                transitioned.append((filename, previous[0], new_state, error_message))
+        
+        # Documents already in the requested state count as transitioned
+        return unchanged + self._record_transitions(workflow_status, transitioned,
+                                                    current_time, quiet)
+    
+    def _apply_transition(self, workflow_status: Dict[str, DocumentInfo], filename: str,
+                          new_state: WorkflowState, error_message: Optional[str],
+                          current_time: datetime
+                          ) -> Optional[Tuple[WorkflowState, Optional[str]]]:
+        """Update a document's state in place and return its previous (state, error).
         
-        if filename not in workflow_status:
+        Returns None for unknown documents. A document already in new_state
+        with the same error is left untouched.
+        """
+        doc_info = workflow_status.get(filename)
+        if doc_info is None:
             print(f"Error: Document {filename} not found in workflow")
-            return False
+            return None
         
-        doc_info = workflow_status[filename]
         old_state = doc_info.current_state
+        previous = (old_state, doc_info.error_message)
+        if previous == (new_state, error_message):
+            return previous
         
         # Update document info
         doc_info.current_state = new_state
-        doc_info.updated_at = datetime.now()
+        doc_info.updated_at = current_time
         doc_info.error_message = error_message
+        self._index_document(workflow_status, doc_info, old_state)
+        return previous
+    
+    def _record_transitions(self, workflow_status: Dict[str, DocumentInfo],
+                            transitioned: List[Tuple], current_time: datetime,
+                            quiet: bool = False) -> List[str]:
+        """Log applied (filename, old_state, new_state, error_message) transitions."""
+        if not transitioned:
+            return []
         
-        # Save updated status
-        workflow_status[filename] = doc_info
-        self.save_workflow_status(workflow_status)
+        # Record the updated status
+        self._append_events(workflow_status, [
+            {'ts': current_time, 'event': 'transition', 'filename': filename,
+             'state': new_state, 'error': error_message}
+            for filename, _, new_state, error_message in transitioned
+        ])
         
-        print(f"✓ Transitioned {filename}: {old_state.value} → {new_state.value}")
-        return True
+        if not quiet:
+            print("\n".join(f"✓ Transitioned {filename}: {old_state.value} → {new_state.value}"
+                            for filename, old_state, new_state, _ in transitioned))
+        return [filename for filename, _, _, _ in transitioned]
     
     def move_document(self, filename: str, from_state: WorkflowState, 
                      to_state: WorkflowState) -> bool:
         """Move a document file between state directories."""
-        try:
-            from_dir = self.state_dirs.get(from_state)
-            to_dir = self.state_dirs.get(to_state)
-            
-            if not from_dir or not to_dir:
-                print(f"Error: Invalid state transition {from_state} → {to_state}")
-                return False
-            
-            from_path = from_dir / filename
-            to_path = to_dir / filename
-            
-            if not from_path.exists():
-                print(f"Error: File {from_path} does not exist")
-                return False
-            
-            # Ensure target directory exists
-            to_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Move the file
-            shutil.move(str(from_path), str(to_path))
-            
-            # Update workflow state
-            self.transition_state(filename, to_state)
-            
-            print(f"✓ Moved {filename} from {from_state.value} to {to_state.value}")
-            return True
+        return bool(self.move_documents([(filename, from_state, to_state)]))
+    
+    @_exclusive
+    def move_documents(self, moves: List[Tuple[str, WorkflowState, WorkflowState]]) -> List[str]:
+        """Move several document files between state directories, then save status once.
+        
+        Each move is (filename, from_state, to_state). The status is loaded once
+        and each document's state is updated as its file moves. Returns the
+        filenames moved.
+        """
+        workflow_status = self.get_workflow_status()
+        current_time = datetime.now()
+        
+        transitioned = []
+        moved = []
+        ensured_dirs = set()
+        for filename, from_state, to_state in moves:
+            new_state, error_message = to_state, None
+            try:
+                from_dir = self._state_dir_strs.get(from_state)
+                to_dir = self._state_dir_strs.get(to_state)
+                
+                if not from_dir or not to_dir:
+                    print(f"Error: Invalid state transition {from_state} → {to_state}")
+                    continue
+                
+                from_path = from_dir + filename
+                to_path = to_dir + filename
+                
+                # Ensure target directory exists, once per batch
+                if to_dir not in ensured_dirs:
+                    os.makedirs(to_dir, exist_ok=True)
+                    ensured_dirs.add(to_dir)
+                
+                # Move the file with a single rename; a missing source surfaces
+                # here instead of through a separate exists() check
+                try:
+                    os.replace(from_path, to_path)
+                except FileNotFoundError:
+                    print(f"Error: File {from_path} does not exist")
+                    continue
+                except OSError as e:
+                    if e.errno != errno.EXDEV:
+                        raise
+                    # Different filesystems: fall back to copy and delete
+                    shutil.move(from_path, to_path)
+                
+                print(f"✓ Moved {filename} from {from_state.value} to {to_state.value}")
+                moved.append(filename)
+                
+            except Exception as e:
+                print(f"Error moving document {filename}: {e}")
+                new_state, error_message = WorkflowState.ERROR, str(e)
             
-        except Exception as e:
-            print(f"Error moving document {filename}: {e}")
-            self.transition_state(filename, WorkflowState.ERROR, str(e))
-            return False
+            # Update workflow state alongside the move
+            previous = self._apply_transition(workflow_status, filename, new_state,
+                                              error_message, current_time)
+            if previous is not None and previous != (new_state, error_message):
+                transitioned.append((filename, previous[0], new_state, error_message))
+        
+        self._record_transitions(workflow_status, transitioned, current_time)
+        return moved
     
     def list_documents_by_state(self, state: WorkflowState) -> List[DocumentInfo]:
-        """Get all documents currently in a specific state."""
-        workflow_status = self.get_workflow_status()
-        return [doc for doc in workflow_status.values() if doc.current_state == state]
+        """Get all documents currently in a specific state, oldest first (read-only)."""
+        return list(self._documents_in_state(state).values())
     
     def get_document_info(self, filename: str) -> Optional[DocumentInfo]:
-        """Get information about a specific document."""
+        """Get information about a specific document from the in-memory status (read-only)."""
         workflow_status = self.get_workflow_status()
         return workflow_status.get(filename)
     
+    def list_filenames_in_state(self, state: WorkflowState,
+                                limit: Optional[int] = None) -> List[str]:
+        """List files in a state's directory, oldest arrival first, without loading status.
+        
+        States without a directory fall back to the status index.
+        """
+        state_dir = self._state_dir_strs.get(state)
+        if state_dir is None:
+            return list(islice(self._documents_in_state(state), limit))
+        
+        try:
+            with os.scandir(state_dir) as entries:
+                # ctime changes when a file is renamed in, so it orders by arrival
+                files = [(entry.stat().st_ctime_ns, entry.name) for entry in entries
+                         if not entry.name.startswith('.') and entry.is_file()]
+        except FileNotFoundError:
+            return []
+        
+        ordered = heapq.nsmallest(limit, files) if limit is not None else sorted(files)
+        return [name for _, name in ordered]
+    
     def get_next_documents_for_processing(self, state: WorkflowState, 
                                         limit: int = 10) -> List[str]:
         """Get next documents ready for processing in a given state."""
-        documents = self.list_documents_by_state(state)
-        # Sort by creation time (oldest first)
-        documents.sort(key=lambda x: x.created_at)
-        return [doc.filename for doc in documents[:limit]]
+        # The index keeps each state's documents oldest first
+        return list(islice(self._documents_in_state(state), limit))
     
     def cleanup_error_documents(self):
         """Move error documents back to pending for retry."""
         error_docs = self.list_documents_by_state(WorkflowState.ERROR)
+        if not error_docs:
+            return
         
-        for doc in error_docs:
-            print(f"Moving error document {doc.filename} back to pending")
-            self.transition_state(doc.filename, WorkflowState.PENDING)
+        print("\n".join(f"Moving error document {doc.filename} back to pending"
+                        for doc in error_docs))
+        self.transition_states([(doc.filename, WorkflowState.PENDING, None) for doc in error_docs])
     
     def print_workflow_summary(self):
         """Print a summary of the current workflow status."""
@@ -225,11 +692,11 @@ class WorkflowManager:
             print("No documents in workflow")
             return
         
-        # Count documents by state
-        state_counts = {}
-        for doc in workflow_status.values():
-            state = doc.current_state
-            state_counts[state] = state_counts.get(state, 0) + 1
+        # Count documents by state, reading bucket sizes if the index is current
+        if self._by_state_source is workflow_status:
+            state_counts = {state: len(bucket) for state, bucket in self._by_state.items()}
+        else:
+            state_counts = Counter(doc.current_state for doc in workflow_status.values())
         
         print("\n=== Workflow Summary ===")
         for state in WorkflowState:
@@ -237,15 +704,14 @@ class WorkflowManager:
             if count > 0:
                 print(f"{state.value.capitalize()}: {count} documents")
         
-        # Show recent activity
-        recent_docs = sorted(workflow_status.values(), 
-                           key=lambda x: x.updated_at, reverse=True)[:5]
+        # Show recent activity; a bounded heap avoids sorting every document
+        recent_docs = heapq.nlargest(5, workflow_status.values(), key=attrgetter('updated_at'))
         
         if recent_docs:
             print("\n=== Recent Activity ===")
             for doc in recent_docs:
                 print(f"{doc.filename}: {doc.current_state.value} "
-                      f"(updated: {doc.updated_at.strftime('%Y-%m-%d %H:%M')})")
+                      f"(updated: {doc.updated_at.isoformat(sep=' ', timespec='minutes')})")
 
 
 def main():
@@ -259,6 +725,8 @@ def main():
                        help='Move error documents back to pending')
     parser.add_argument('--list-state', choices=[s.value for s in WorkflowState],
                        help='List documents in specific state')
+    parser.add_argument('--compact', action='store_true',
+                       help='Fold the workflow event log into the status snapshot')
     
     args = parser.parse_args()
     
@@ -270,12 +738,18 @@ def main():
     elif args.cleanup_errors:
         wm.cleanup_error_documents()
         print("✓ Error cleanup completed")
+    elif args.compact:
+        wm.compact()
+        print("✓ Workflow status compacted")
     elif args.list_state:
         state = WorkflowState(args.list_state)
         docs = wm.list_documents_by_state(state)
         print(f"\nDocuments in {state.value} state:")
-        for doc in docs:
-            print(f"  {doc.filename} (created: {doc.created_at.strftime('%Y-%m-%d %H:%M')})")
+        # isoformat avoids strftime's format parsing; one write for the whole list
+        sys.stdout.write("".join(
+            f"  {doc.filename} (created: {doc.created_at.isoformat(sep=' ', timespec='minutes')})\n"
+            for doc in docs
+        ))
     else:
         wm.print_workflow_summary()
 
@@ -0,0 +1,170 @@
+"""Tests for the workflow status snapshot, event log and compaction."""
+
+import io
+import multiprocessing
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import workflow_manager
+from workflow_manager import WorkflowManager, WorkflowState
+
+
+def _states(manager: WorkflowManager) -> dict:
+    """Return each document's (state, error) as read by the given manager."""
+    return {filename: (doc.current_state, doc.error_message)
+            for filename, doc in manager.get_workflow_status().items()}
+
+
+def _register_many(base_path: str, worker: int, count: int):
+    """Register documents from a separate process, compacting often."""
+    manager = WorkflowManager(base_path)
+    manager.COMPACT_THRESHOLD = 7
+    with redirect_stdout(io.StringIO()):
+        for i in range(count):
+            filename = manager.register_document(f"/intake/w{worker}_{i}.pdf")
+            manager.transition_state(filename, WorkflowState.PROCESSING)
+
+
+class WorkflowStatusTests(unittest.TestCase):
+    """Status must survive replay, compaction and concurrent writers."""
+    
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.base_path = self._tmp.name
+        os.makedirs(os.path.join(self.base_path, "workflows"))
+        self._stdout = redirect_stdout(io.StringIO())
+        self._stdout.__enter__()
+    
+    def tearDown(self):
+        self._stdout.__exit__(None, None, None)
+        self._tmp.cleanup()
+    
+    def manager(self) -> WorkflowManager:
+        return WorkflowManager(self.base_path)
+    
+    def test_events_are_replayed_by_a_new_instance(self):
+        writer = self.manager()
+        writer.register_documents([("/intake/a.pdf", None), ("/intake/b.pdf", {"k": 1})])
+        writer.transition_state("a.pdf", WorkflowState.ERROR, "bad scan")
+        
+        self.assertFalse(writer.status_file.exists())
+        self.assertEqual(_states(self.manager()), {
+            "a.pdf": (WorkflowState.ERROR, "bad scan"),
+            "b.pdf": (WorkflowState.PENDING, None),
+        })
+        self.assertEqual(self.manager().get_document_info("b.pdf").metadata, {"k": 1})
+    
+    def test_cached_status_picks_up_other_writers(self):
+        reader, writer = self.manager(), self.manager()
+        writer.register_document("/intake/a.pdf")
+        cached = reader.get_workflow_status()
+        
+        writer.transition_state("a.pdf", WorkflowState.PROCESSING)
+        writer.register_document("/intake/b.pdf")
+        
+        # Only the log tail is replayed, into the same cached dict
+        self.assertIs(reader.get_workflow_status(), cached)
+        self.assertEqual(_states(reader), _states(self.manager()))
+        self.assertEqual(reader.get_next_documents_for_processing(WorkflowState.PENDING),
+                         ["b.pdf"])
+    
+    def test_cached_status_reloads_after_another_compaction(self):
+        reader, writer = self.manager(), self.manager()
+        writer.register_documents([("/intake/a.pdf", None), ("/intake/b.pdf", None)])
+        reader.get_workflow_status()
+        
+        writer.transition_state("a.pdf", WorkflowState.APPROVED)
+        writer.compact()
+        writer.transition_state("b.pdf", WorkflowState.ERROR, "timeout")
+        
+        self.assertEqual(_states(reader), {
+            "a.pdf": (WorkflowState.APPROVED, None),
+            "b.pdf": (WorkflowState.ERROR, "timeout"),
+        })
+        self.assertEqual(reader.list_documents_by_state(WorkflowState.APPROVED)[0].filename,
+                         "a.pdf")
+    
+    def test_compaction_folds_the_log(self):
+        manager = self.manager()
+        manager.register_documents([(f"/intake/d{i}.pdf", None) for i in range(5)])
+        manager.transition_state("d3.pdf", WorkflowState.EXTRACTED)
+        expected = _states(manager)
+        
+        manager.compact()
+        
+        self.assertFalse(manager.events_file.exists())
+        self.assertTrue(manager.status_cache_file.exists())
+        self.assertEqual(_states(self.manager()), expected)
+        # The JSON snapshot alone is enough too
+        manager.status_cache_file.unlink()
+        self.assertEqual(_states(self.manager()), expected)
+    
+    def test_save_keeps_events_logged_after_the_read(self):
+        first, second = self.manager(), self.manager()
+        first.register_documents([("/intake/a.pdf", None), ("/intake/b.pdf", None)])
+        status = first.get_workflow_status()
+        
+        second.transition_state("b.pdf", WorkflowState.VALIDATED)
+        first.save_workflow_status(status)
+        
+        self.assertEqual(_states(self.manager())["b.pdf"], (WorkflowState.VALIDATED, None))
+    
+    def test_save_rejects_a_status_that_is_not_current(self):
+        manager = self.manager()
+        manager.register_document("/intake/a.pdf")
+        stale = dict(manager.get_workflow_status())
+        
+        with self.assertRaises(ValueError):
+            manager.save_workflow_status(stale)
+    
+    def test_automatic_compaction_keeps_every_event(self):
+        manager = self.manager()
+        manager.COMPACT_THRESHOLD = 3
+        for i in range(10):
+            manager.register_document(f"/intake/d{i}.pdf")
+        manager.transition_states([(f"d{i}.pdf", WorkflowState.PROCESSING, None)
+                                   for i in range(0, 10, 2)])
+        
+        states = _states(self.manager())
+        self.assertEqual(len(states), 10)
+        self.assertEqual(sum(state == WorkflowState.PROCESSING for state, _ in states.values()), 5)
+    
+    def test_malformed_log_line_is_skipped(self):
+        manager = self.manager()
+        manager.register_document("/intake/a.pdf")
+        with open(manager.events_file, "ab") as f:
+            f.write(b'{"event": "transi')
+        
+        self.assertEqual(_states(self.manager()), {"a.pdf": (WorkflowState.PENDING, None)})
+    
+    def test_unreadable_snapshot_raises(self):
+        manager = self.manager()
+        manager.status_file.write_text("{not json")
+        
+        with self.assertRaises(ValueError):
+            manager.get_workflow_status()
+    
+    @unittest.skipIf(workflow_manager.fcntl is None, "advisory locking needs fcntl")
+    def test_concurrent_writers_lose_no_events(self):
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=_register_many, args=(self.base_path, worker, 40))
+                   for worker in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+            self.assertEqual(worker.exitcode, 0)
+        
+        states = _states(self.manager())
+        self.assertEqual(len(states), 160)
+        self.assertTrue(all(state == WorkflowState.PROCESSING for state, _ in states.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()